@@ -0,0 +1,54 @@
+# Seeded random inputs for the benchmarks. The same seed and size always make
+# the same data.
+import random
+import string
+
+from graphs.adjacency_matrix import AdjacencyMatrix
+from graphs.binary_tree_list import BinaryTree
+
+def vertex_labels(n):
+    return [f'v{i}' for i in range(n)]
+
+def random_graph(n, seed, density=0.1, max_cost=100, directed=False):
+    """
+    AdjacencyMatrix of n vertices where each possible edge exists with
+    probability density.
+    """
+    rng = random.Random(seed)
+    graph = AdjacencyMatrix(n)
+    labels = vertex_labels(n)
+    for index, label in enumerate(labels):
+        graph.set_vertex(index, label)
+    for i, label1 in enumerate(labels):
+        # undirected edges are set both ways, only consider each pair once
+        start = 0 if directed else i + 1
+        for label2 in labels[start:]:
+            if label1 != label2 and rng.random() < density:
+                cost = rng.randint(1, max_cost)
+                graph.set_edge(label1, label2, directed=directed, cost=cost)
+    return graph
+
+def random_matrix(rows, cols, seed, low=-100, high=100):
+    """
+    List of lists matrix of random integers.
+    """
+    rng = random.Random(seed)
+    return [[rng.randint(low, high) for _ in range(cols)] for _ in range(rows)]
+
+def random_tree(n, seed):
+    """
+    BinaryTree of n level-order elements, some of them missing (None).
+    """
+    rng = random.Random(seed)
+    elements = [rng.randint(0, n) for _ in range(n)]
+    # keep the root, remove about a tenth of the rest
+    for index in rng.sample(range(1, n), (n - 1) // 10) if n > 1 else ():
+        elements[index] = None
+    return BinaryTree(*elements)
+
+def random_text(n, seed):
+    """
+    String of n random printable characters.
+    """
+    rng = random.Random(seed)
+    return ''.join(rng.choice(string.printable) for _ in range(n))
@@ -0,0 +1,223 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+
+import matrix
+import reversestring
+
+from graphs.adjacency_matrix import AdjacencyMatrix
+from graphs.centrality import pagerank
+from graphs.contraction_hierarchies import ContractionHierarchy
+from graphs.dijkstra import dijkstra
+from graphs.minimum_spanning_tree import kruskal
+from graphs.minimum_spanning_tree import prim
+
+from .data import random_graph
+from .data import random_matrix
+from .data import random_text
+from .data import random_tree
+from .data import vertex_labels
+
+# Each benchmark takes a size and a seed, does its setup and returns a
+# callable taking no arguments, which is what is timed.
+benchmarks = {}
+
+def benchmark(func):
+    benchmarks[func.__name__] = func
+    return func
+
+@benchmark
+def adjacency_matrix_construction(size, seed):
+    labels = vertex_labels(size)
+    edges = random_graph(size, seed).get_edges()
+
+    def construct():
+        graph = AdjacencyMatrix(size)
+        for index, label in enumerate(labels):
+            graph.set_vertex(index, label)
+        for v1, v2, cost in edges:
+            graph.set_edge(v1, v2, directed=True, cost=cost)
+
+    return construct
+
+@benchmark
+def get_edges(size, seed):
+    graph = random_graph(size, seed)
+    return graph.get_edges
+
+@benchmark
+def get_neighbors(size, seed):
+    graph = random_graph(size, seed)
+    vertex = graph.get_vertices()[0]
+    return lambda: list(graph.get_neighbors(vertex))
+
+@benchmark
+def dijkstra_all(size, seed):
+    graph = random_graph(size, seed)
+    source = graph.get_vertices()[0]
+    return lambda: dijkstra(graph, source)
+
+@benchmark
+def contraction_hierarchy_query(size, seed):
+    graph = random_graph(size, seed)
+    hierarchy = ContractionHierarchy.from_graph(graph)
+    vertices = graph.get_vertices()
+    source, target = vertices[0], vertices[-1]
+    return lambda: hierarchy.query(source, target)
+
+@benchmark
+def minimum_spanning_tree_kruskal(size, seed):
+    graph = random_graph(size, seed)
+    return lambda: kruskal(graph)
+
+@benchmark
+def minimum_spanning_tree_prim(size, seed):
+    graph = random_graph(size, seed)
+    return lambda: prim(graph)
+
+@benchmark
+def pagerank_converge(size, seed):
+    graph = random_graph(size, seed, directed=True)
+    return lambda: pagerank(graph)
+
+@benchmark
+def matrix_add(size, seed):
+    A = random_matrix(size, size, seed)
+    B = random_matrix(size, size, seed + 1)
+    return lambda: matrix.add(A, B)
+
+@benchmark
+def matrix_dotproduct(size, seed):
+    A = random_matrix(size, size, seed)
+    B = random_matrix(size, size, seed + 1)
+    return lambda: matrix.dotproduct(A, B)
+
+@benchmark
+def reversestring_xor(size, seed):
+    text = random_text(size * 1024, seed)
+    return lambda: reversestring.reversestring(text)
+
+@benchmark
+def reversestring_codepoints(size, seed):
+    text = random_text(size * 1024, seed)
+    return lambda: reversestring.reversestring_codepoints(text)
+
+@benchmark
+def reverse_buffer_chunked(size, seed):
+    view = memoryview(bytearray(random_text(size * 1024, seed).encode()))
+    return lambda: reversestring.reverse_buffer(view, chunk_size=4096)
+
+@benchmark
+def binary_tree_preorder(size, seed):
+    tree = random_tree(size, seed)
+    return tree.preorder
+
+@benchmark
+def binary_tree_level_order(size, seed):
+    tree = random_tree(size, seed)
+    return tree.level_order
+
+def time_callable(func, repeat):
+    """
+    Time func, choosing the number of calls per repeat automatically. Return
+    dict of per-call timings in seconds.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'min': min(times),
+        'median': statistics.median(times),
+        'number': number,
+        'repeat': repeat,
+    }
+
+def run(names, sizes, seed, repeat, log=None):
+    """
+    Run the named benchmarks at each size. Return dict of results keyed by
+    "name[size]".
+    """
+    results = {}
+    for name in names:
+        for size in sizes:
+            key = f'{name}[{size}]'
+            func = benchmarks[name](size, seed)
+            results[key] = time_callable(func, repeat)
+            if log is not None:
+                print(f'{key:<40} {results[key]["min"]*1000:12.4f} ms', file=log)
+    return results
+
+def compare(results, baseline, tolerance):
+    """
+    Return list of (key, baseline seconds, result seconds, ratio) for results
+    slower than baseline by more than tolerance, a fraction. Only benchmarks
+    present in both are compared.
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        before = baseline[key]['min']
+        after = result['min']
+        ratio = after / before
+        if ratio > 1 + tolerance:
+            regressions.append((key, before, after, ratio))
+    return regressions
+
+def main(argv=None):
+    """
+    Time graph, matrix and tree operations on seeded random data.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        'names',
+        nargs='*',
+        help=f'Benchmarks to run. Default: all. Choices: {", ".join(benchmarks)}',
+    )
+    parser.add_argument('--sizes', nargs='+', type=int, default=[16, 64, 128])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write JSON results to this file.')
+    parser.add_argument(
+        '--baseline',
+        help='JSON results file to compare against. Exit status 1 on regression.',
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.10,
+        help='Allowed slowdown against baseline as a fraction. Default: %(default)s',
+    )
+    args = parser.parse_args(argv)
+
+    names = args.names or list(benchmarks)
+    unknown = set(names).difference(benchmarks)
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(sorted(unknown))}')
+    results = run(names, args.sizes, args.seed, args.repeat, log=sys.stdout)
+    document = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'sizes': args.sizes,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(document, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline['results'], args.tolerance)
+        for key, before, after, ratio in regressions:
+            print(f'REGRESSION {key}: {before*1000:.4f} ms -> {after*1000:.4f} ms ({ratio:.2f}x)')
+        if regressions:
+            return 1
+    return 0
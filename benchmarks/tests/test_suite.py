@@ -0,0 +1,34 @@
+import unittest
+
+from benchmarks.data import random_graph
+from benchmarks.data import random_matrix
+from benchmarks.suite import benchmarks
+from benchmarks.suite import compare
+
+class TestData(unittest.TestCase):
+
+    def test_seeded(self):
+        "Same seed and size make the same data."
+        self.assertEqual(
+            random_graph(20, seed=1).get_matrix(),
+            random_graph(20, seed=1).get_matrix())
+        self.assertEqual(random_matrix(3, 4, seed=1), random_matrix(3, 4, seed=1))
+        self.assertNotEqual(random_matrix(3, 4, seed=1), random_matrix(3, 4, seed=2))
+
+
+class TestSuite(unittest.TestCase):
+
+    def test_benchmarks_run(self):
+        "Every benchmark sets up and runs at a small size."
+        for name, setup in benchmarks.items():
+            with self.subTest(name=name):
+                setup(4, 0)()
+
+    def test_compare(self):
+        baseline = {'a[1]': {'min': 1.0}, 'b[1]': {'min': 1.0}}
+        results = {'a[1]': {'min': 1.05}, 'b[1]': {'min': 1.5}, 'c[1]': {'min': 9.0}}
+        self.assertEqual(compare(results, baseline, 0.10), [('b[1]', 1.0, 1.5, 1.5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -22,14 +22,20 @@ class AdjacencyMatrix:
     notset = -1
     default_cost = 0
 
-    def __init__(self, nvertices):
+    def __init__(self, nvertices, stats=None):
         """
         :param nvertices: the number of vertices.
+        :param stats: Optional graphs.stats.Stats to count operations with.
         """
         self.nvertices = nvertices
+        self.stats = stats
         self.adjacency_matrix = [[self.notset]*self.nvertices for _ in range(self.nvertices)]
         self.vertices = {}
         self.vertices_list = [0]*self.nvertices
+        # incremented on every change so that consumers, like renderers, can
+        # cheaply tell if their cached view of the graph is stale. Setting
+        # what is already set is not a change.
+        self.version = 0
 
     def set_vertex(self, vertex, id):
         """
@@ -38,8 +44,11 @@ class AdjacencyMatrix:
         """
         # TODO: let this raise IndexError?
         if 0 <= vertex <= self.nvertices:
+            if self.vertices.get(id) == vertex and self.vertices_list[vertex] == id:
+                return
             self.vertices[id] = vertex
             self.vertices_list[vertex] = id
+            self.version += 1
 
     def set_edge(self, vertex1, vertex2, directed=False, cost=None):
         """
@@ -52,17 +61,25 @@ class AdjacencyMatrix:
             cost = self.default_cost
         vertex1 = self.vertices[vertex1]
         vertex2 = self.vertices[vertex2]
-        self.adjacency_matrix[vertex1][vertex2] = cost
+        matrix = self.adjacency_matrix
+        changed = matrix[vertex1][vertex2] != cost
+        matrix[vertex1][vertex2] = cost
         if not directed:
-            self.adjacency_matrix[vertex2][vertex1] = cost
+            changed = changed or matrix[vertex2][vertex1] != cost
+            matrix[vertex2][vertex1] = cost
+        if changed:
+            self.version += 1
 
     def remove_vertex(self, id):
         self.vertices_list.remove(id)
         self.vertices.pop(id)
+        self.version += 1
 
     def remove_edge(self, vertex1, vertex2):
         i = self.vertices_list.index(vertex1)
         j = self.vertices_list.index(vertex2)
+        if self.adjacency_matrix[i][j] != self.notset or self.adjacency_matrix[j][i] != self.notset:
+            self.version += 1
         self.adjacency_matrix[i][j] = self.notset
         # ensure undirected edge is removed too
         self.adjacency_matrix[j][i] = self.notset
@@ -76,6 +93,8 @@ class AdjacencyMatrix:
         return self.vertices_list
 
     def get_edges(self):
+        if self.stats is not None:
+            self.stats.edge_scans += self.nvertices * self.nvertices
         edges = []
         for i in range(self.nvertices):
             for j in range(self.nvertices):
@@ -87,6 +106,17 @@ class AdjacencyMatrix:
                     edges.append(edge)
         return edges
 
+    def get_adjacency(self):
+        """
+        Outgoing edges by vertex index, a list of lists of (index, cost).
+        """
+        if self.stats is not None:
+            self.stats.edge_scans += self.nvertices * self.nvertices
+        notset = self.notset
+        return [
+            [(j, cost) for j, cost in enumerate(row) if cost != notset]
+            for row in self.adjacency_matrix]
+
     def get_matrix(self):
         return self.adjacency_matrix
 
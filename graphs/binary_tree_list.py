@@ -43,7 +43,7 @@ class BinaryTree:
         self._tree = list(level_order_elements)
 
     def _check_index(self, index):
-        if (index <= len(self._tree)
+        if (index < len(self._tree)
                 and self._tree[index] is not None):
             return index
 
@@ -66,6 +66,42 @@ class BinaryTree:
             t += self.count(d)
         return d
 
+    def preorder(self, index=0):
+        """
+        Node-left-right traversal of the values under index. Children of
+        missing (None) nodes are not part of the tree.
+        """
+        values = []
+        if self._check_index(index) is None:
+            return values
+        stack = [index]
+        while stack:
+            index = stack.pop()
+            values.append(self.value(index))
+            right = self.right_child_index(index)
+            if right is not None:
+                stack.append(right)
+            left = self.left_child_index(index)
+            if left is not None:
+                stack.append(left)
+        return values
+
+    def level_order(self):
+        """
+        Values level by level, the same nodes as preorder.
+        """
+        values = []
+        level = [] if self._check_index(0) is None else [0]
+        while level:
+            values.extend(self.value(index) for index in level)
+            children = []
+            for index in level:
+                for child in (self.left_child_index(index), self.right_child_index(index)):
+                    if child is not None:
+                        children.append(child)
+            level = children
+        return values
+
     def insert(self, node):
         raise NotImplementedError
 
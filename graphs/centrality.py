@@ -0,0 +1,128 @@
+# https://en.wikipedia.org/wiki/PageRank
+# https://en.wikipedia.org/wiki/Eigenvector_centrality
+import math
+
+class SparseLinks:
+    """
+    Sparse square matrix of the links of a graph, stored by row as lists of
+    (column, value), so that a matrix-vector product only touches existing
+    edges. Built from AdjacencyMatrix, cells equal to notset are not links.
+    Edge costs are ignored, every link counts the same.
+    """
+
+    def __init__(self, graph, normalize=False):
+        """
+        :param normalize: Optional, if true, divide each column by its sum so
+                          that columns of vertices with links sum to one.
+        """
+        self.labels = list(graph.get_vertices())
+        n = self.n = graph.nvertices
+        self.out_degree = [0] * n
+        # rows[i] holds the columns j of links j -> i
+        self.rows = [[] for _ in range(n)]
+        for j, row in enumerate(graph.get_matrix()):
+            for i, cost in enumerate(row):
+                if cost != graph.notset:
+                    self.rows[i].append(j)
+                    self.out_degree[j] += 1
+        # vertices without outgoing links, their columns are all zero
+        self.dangling = [j for j, degree in enumerate(self.out_degree) if degree == 0]
+        if normalize:
+            self.rows = [
+                [(j, 1 / self.out_degree[j]) for j in row] for row in self.rows]
+        else:
+            self.rows = [[(j, 1) for j in row] for row in self.rows]
+
+    def multiply(self, vector):
+        """
+        Product of this matrix and vector, a list.
+        """
+        return [sum(value * vector[j] for j, value in row) for row in self.rows]
+
+
+class CentralityResult:
+    """
+    Scores by vertex label and how the iteration went.
+    """
+
+    def __init__(self, scores, iterations, residuals, converged):
+        self.scores = scores
+        self.iterations = iterations
+        # L1 norm of the change in the scores, per iteration
+        self.residuals = residuals
+        self.converged = converged
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}(iterations={self.iterations},'
+            f' residual={self.residuals[-1] if self.residuals else None},'
+            f' converged={self.converged})')
+
+
+def residual(vector1, vector2):
+    return sum(abs(a - b) for a, b in zip(vector1, vector2))
+
+def pagerank(graph, damping=0.85, tolerance=1e-10, max_iterations=100):
+    """
+    PageRank of each vertex of graph, an AdjacencyMatrix, by power iteration.
+    The rank of dangling vertices, those without outgoing edges, is spread
+    evenly over all vertices.
+
+    :param damping: Optional probability of following a link instead of
+                    jumping to a random vertex.
+    :param tolerance: Optional L1 change in ranks to stop at.
+    :param max_iterations: Optional limit of iterations.
+    :return: CentralityResult, scores sum to one.
+    """
+    matrix = SparseLinks(graph, normalize=True)
+    n = matrix.n
+    if n == 0:
+        return CentralityResult({}, 0, [], True)
+    ranks = [1 / n] * n
+    residuals = []
+    converged = False
+    # initial scores, if there are no iterations
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        dangling_rank = sum(ranks[j] for j in matrix.dangling)
+        # random jump plus dangling rank, the same for every vertex
+        base = (1 - damping) / n + damping * dangling_rank / n
+        new_ranks = [base + damping * linked for linked in matrix.multiply(ranks)]
+        residuals.append(residual(new_ranks, ranks))
+        ranks = new_ranks
+        if residuals[-1] < tolerance:
+            converged = True
+            break
+    scores = dict(zip(matrix.labels, ranks))
+    return CentralityResult(scores, iteration, residuals, converged)
+
+def eigenvector_centrality(graph, tolerance=1e-10, max_iterations=100):
+    """
+    Eigenvector centrality of each vertex of graph, an AdjacencyMatrix, by
+    power iteration. A vertex scores by the scores of the vertices linking to
+    it. Iterates with the matrix plus identity, which has the same
+    eigenvectors but does not oscillate on bipartite graphs.
+
+    :param tolerance: Optional L1 change in scores to stop at.
+    :param max_iterations: Optional limit of iterations.
+    :return: CentralityResult, scores have a Euclidean norm of one.
+    """
+    matrix = SparseLinks(graph)
+    n = matrix.n
+    if n == 0:
+        return CentralityResult({}, 0, [], True)
+    scores = [1 / n] * n
+    residuals = []
+    converged = False
+    # initial scores, if there are no iterations
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        new_scores = [score + linked for score, linked in zip(scores, matrix.multiply(scores))]
+        norm = math.sqrt(sum(score * score for score in new_scores))
+        new_scores = [score / norm for score in new_scores]
+        residuals.append(residual(new_scores, scores))
+        scores = new_scores
+        if residuals[-1] < tolerance:
+            converged = True
+            break
+    return CentralityResult(dict(zip(matrix.labels, scores)), iteration, residuals, converged)
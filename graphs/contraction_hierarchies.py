@@ -0,0 +1,298 @@
+# https://en.wikipedia.org/wiki/Contraction_hierarchies
+# Geisberger, Sanders, Schultes, Delling. Contraction Hierarchies: Faster and
+# Simpler Hierarchical Routing in Road Networks. 2008.
+import hashlib
+import heapq
+import itertools
+import json
+import math
+
+def graph_fingerprint(graph):
+    """
+    Digest of the vertices and edges of graph, to tell if a saved hierarchy
+    belongs to it.
+    """
+    return data_fingerprint(graph.get_vertices(), graph.get_edges())
+
+def data_fingerprint(vertices, edges):
+    """
+    graph_fingerprint of the vertices and edges of a graph.
+    """
+    data = json.dumps([list(vertices), [list(edge) for edge in edges]])
+    return hashlib.sha256(data.encode()).hexdigest()
+
+def from_json(value):
+    """
+    Vertex label read back from JSON, lists were tuples.
+    """
+    if isinstance(value, list):
+        return tuple(from_json(item) for item in value)
+    return value
+
+
+class ContractionHierarchy:
+    """
+    Preprocessed graph answering point-to-point shortest path queries by
+    searching only upward in a vertex ordering.
+
+    Vertices are contracted, least important first. Contracting a vertex
+    removes it from the remaining graph, adding a shortcut edge between two of
+    its neighbors wherever the path through it was the only shortest one. A
+    query searches forward from the source and backward from the target, each
+    only along edges to vertices contracted later, and meets in the middle.
+
+    Distances are the same as from dijkstra. Paths are too, where the shortest
+    path is unique; otherwise an equally short path may be returned.
+    """
+
+    def __init__(self, order, up, down, middle, fingerprint=None):
+        """
+        :param order: vertices in contraction order.
+        :param up: dict vertex -> {higher vertex: cost} of edges out of vertex.
+        :param down: dict vertex -> {higher vertex: cost} of edges into vertex.
+        :param middle: dict (vertex1, vertex2) -> vertex that the shortcut edge
+                       vertex1 -> vertex2 skips.
+        :param fingerprint: Optional graph_fingerprint of the graph.
+        """
+        self.order = order
+        self.rank = {vertex: rank for rank, vertex in enumerate(order)}
+        self.up = up
+        self.down = down
+        self.middle = middle
+        self.fingerprint = fingerprint
+        # (vertices, edges) of the graph, fingerprinted on save if needed
+        self.graph_data = None
+
+    @classmethod
+    def from_graph(cls, graph, witness_limit=100):
+        """
+        Contract all the vertices of graph.
+
+        :param graph: object with get_vertices and get_edges methods, like
+                      AdjacencyMatrix.
+        :param witness_limit: Optional number of vertices a witness search may
+                              settle before giving up and adding the
+                              shortcut. Lower is faster to preprocess but may
+                              add unneeded shortcuts.
+        """
+        vertices = list(graph.get_vertices())
+        edges = list(graph.get_edges())
+        # remaining graph, including shortcuts
+        out_edges = {vertex: {} for vertex in vertices}
+        in_edges = {vertex: {} for vertex in vertices}
+        for v1, v2, cost in edges:
+            if v1 == v2:
+                continue
+            if cost < out_edges[v1].get(v2, math.inf):
+                out_edges[v1][v2] = cost
+                in_edges[v2][v1] = cost
+        middle = {}
+        contracted_neighbors = {vertex: 0 for vertex in vertices}
+
+        def witness_distances(start, skip, max_cost):
+            # limited dijkstra in the remaining graph, avoiding skip
+            dist = {start: 0}
+            heap = [(0, 0, start)]
+            counter = settled = 0
+            while heap and settled < witness_limit:
+                d, _, current = heapq.heappop(heap)
+                if d > dist[current]:
+                    continue
+                if d > max_cost:
+                    break
+                settled += 1
+                for v, cost in out_edges[current].items():
+                    alt = d + cost
+                    if v != skip and alt < dist.get(v, math.inf):
+                        dist[v] = alt
+                        counter += 1
+                        heapq.heappush(heap, (alt, counter, v))
+            return dist
+
+        def shortcuts(vertex):
+            # shortcuts needed to contract vertex
+            needed = []
+            outgoing = out_edges[vertex]
+            if not outgoing:
+                return needed
+            max_out = max(outgoing.values())
+            for u, in_cost in in_edges[vertex].items():
+                dist = witness_distances(u, vertex, in_cost + max_out)
+                for w, out_cost in outgoing.items():
+                    if w == u:
+                        continue
+                    cost = in_cost + out_cost
+                    if dist.get(w, math.inf) > cost:
+                        needed.append((u, w, cost))
+            return needed
+
+        def priority(vertex):
+            # edge difference plus contracted neighbors, to spread out
+            # contraction evenly, and the shortcuts it counted
+            needed = shortcuts(vertex)
+            removed = len(in_edges[vertex]) + len(out_edges[vertex])
+            return (len(needed) - removed + contracted_neighbors[vertex], needed)
+
+        queue = [(priority(vertex)[0], index, vertex) for index, vertex in enumerate(vertices)]
+        heapq.heapify(queue)
+        order = []
+        up = {}
+        down = {}
+        while queue:
+            _, index, vertex = heapq.heappop(queue)
+            # lazy update, priorities change as neighbors are contracted
+            current, needed = priority(vertex)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, index, vertex))
+                continue
+            for u, w, cost in needed:
+                if cost < out_edges[u].get(w, math.inf):
+                    out_edges[u][w] = cost
+                    in_edges[w][u] = cost
+                    middle[(u, w)] = vertex
+            # everything still connected is contracted later, higher
+            up[vertex] = out_edges.pop(vertex)
+            down[vertex] = in_edges.pop(vertex)
+            for w in up[vertex]:
+                del in_edges[w][vertex]
+                contracted_neighbors[w] += 1
+            for u in down[vertex]:
+                del out_edges[u][vertex]
+                contracted_neighbors[u] += 1
+            order.append(vertex)
+
+        hierarchy = cls(order, up, down, middle)
+        # vertices need only be JSON values to save
+        hierarchy.graph_data = (vertices, edges)
+        return hierarchy
+
+    def query(self, source, target, stats=None):
+        """
+        Shortest path from source to target.
+
+        :param stats: Optional graphs.stats.Stats to count operations with.
+        :return: tuple (cost, path). path is list of vertices from source to
+                 target. (math.inf, []) if target is unreachable.
+        """
+        for vertex in (source, target):
+            if vertex not in self.rank:
+                raise KeyError(vertex)
+        # forward from source on upward edges, backward from target on
+        # downward edges
+        edges = (self.up, self.down)
+        dists = ({source: 0}, {target: 0})
+        prevs = ({}, {})
+        heaps = ([(0, 0, source)], [(0, 0, target)])
+        if stats is not None:
+            stats.heap_pushes += 2
+        counter = itertools.count(1)
+        best = math.inf
+        meet = None
+        searching = True
+        while searching:
+            searching = False
+            for side in (0, 1):
+                heap = heaps[side]
+                # a side is done when it cannot improve the best
+                if not heap or heap[0][0] >= best:
+                    continue
+                searching = True
+                d, _, current = heapq.heappop(heap)
+                if stats is not None:
+                    stats.heap_pops += 1
+                dist = dists[side]
+                if d > dist[current]:
+                    continue
+                other = dists[1 - side]
+                if current in other and d + other[current] < best:
+                    best = d + other[current]
+                    meet = current
+                neighbors = edges[side][current]
+                if stats is not None:
+                    stats.vertices_settled += 1
+                    stats.neighbor_scans += len(neighbors)
+                prev = prevs[side]
+                for v, cost in neighbors.items():
+                    alt = d + cost
+                    if alt < dist.get(v, math.inf):
+                        dist[v] = alt
+                        prev[v] = current
+                        heapq.heappush(heap, (alt, next(counter), v))
+                        if stats is not None:
+                            stats.edges_relaxed += 1
+                            stats.heap_pushes += 1
+
+        if meet is None:
+            return (math.inf, [])
+        # hierarchy vertices from source up to meet and down to target
+        vertices = [meet]
+        while vertices[-1] != source:
+            vertices.append(prevs[0][vertices[-1]])
+        vertices.reverse()
+        while vertices[-1] != target:
+            vertices.append(prevs[1][vertices[-1]])
+        path = [source]
+        for v1, v2 in zip(vertices, vertices[1:]):
+            path.extend(self.unpack(v1, v2)[1:])
+        return (best, path)
+
+    def unpack(self, vertex1, vertex2):
+        """
+        Vertices of the original graph along the edge vertex1 -> vertex2,
+        expanding shortcuts.
+        """
+        path = [vertex1]
+        stack = [(vertex1, vertex2)]
+        while stack:
+            v1, v2 = stack.pop()
+            v = self.middle.get((v1, v2))
+            if v is None:
+                path.append(v2)
+            else:
+                # second half popped after the first
+                stack.append((v, v2))
+                stack.append((v1, v))
+        return path
+
+    def save(self, path):
+        """
+        Write hierarchy as JSON to file path. Vertices must be JSON values or
+        tuples of them.
+        """
+        if self.fingerprint is None and self.graph_data is not None:
+            self.fingerprint = data_fingerprint(*self.graph_data)
+        data = {
+            'fingerprint': self.fingerprint,
+            'order': self.order,
+            'up': [[v1, v2, cost] for v1, edges in self.up.items() for v2, cost in edges.items()],
+            'down': [[v1, v2, cost] for v2, edges in self.down.items() for v1, cost in edges.items()],
+            'middle': [[v1, v2, v] for (v1, v2), v in self.middle.items()],
+        }
+        # serialize first, not to leave a partial file if a vertex is not JSON
+        text = json.dumps(data)
+        with open(path, 'w') as hierarchy_file:
+            hierarchy_file.write(text)
+
+    @classmethod
+    def load(cls, path, graph=None):
+        """
+        Read hierarchy written by save from file path.
+
+        :param graph: Optional graph the hierarchy was made from, raise
+                      ValueError if it has changed since.
+        """
+        with open(path) as hierarchy_file:
+            data = json.load(hierarchy_file)
+        if graph is not None and graph_fingerprint(graph) != data['fingerprint']:
+            raise ValueError(f'{path} was not made from this graph')
+        order = [from_json(vertex) for vertex in data['order']]
+        up = {vertex: {} for vertex in order}
+        down = {vertex: {} for vertex in order}
+        for v1, v2, cost in data['up']:
+            up[from_json(v1)][from_json(v2)] = cost
+        for v1, v2, cost in data['down']:
+            down[from_json(v2)][from_json(v1)] = cost
+        middle = {
+            (from_json(v1), from_json(v2)): from_json(v)
+            for v1, v2, v in data['middle']}
+        return cls(order, up, down, middle, data['fingerprint'])
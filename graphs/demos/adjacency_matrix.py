@@ -3,6 +3,8 @@ import contextlib
 import math
 import os
 import random
+import statistics
+import time
 
 from itertools import chain
 from itertools import repeat
@@ -47,54 +49,263 @@ def make_vertex_sprite(font, label, *groups):
     sprite.center = pygame.Vector2(sprite.rect.center)
     return sprite
 
-def render_matrix(
-    font,
-    graph,
-    padding=0,
-    font_color=(200,)*3,
-    border_color=(200,)*3,
-):
+class MatrixRenderer:
     """
-    Render an image of the adjacency matrix.
+    Cached image of an adjacency matrix table. The table is only rebuilt when
+    the graph's version changes and then only the cells that changed are
+    redrawn, unless the labels or cell size changed. The cells grow and shrink
+    to fit the largest text, as they would when drawn from scratch.
+    """
+
+    def __init__(
+        self,
+        font,
+        padding=0,
+        font_color=(200,)*3,
+        border_color=(200,)*3,
+    ):
+        self.font = font
+        self.padding = padding
+        self.font_color = font_color
+        self.border_color = border_color
+        # cell text -> (size, rendered text image)
+        self.glyphs = {}
+        self.version = None
+        self.labels = None
+        self.matrix = None
+        self.cell_size = None
+        self.empty_image = None
+        self.table_image = None
+
+    def glyph(self, text):
+        """
+        Return cached size and rendered image of text.
+        """
+        try:
+            return self.glyphs[text]
+        except KeyError:
+            glyph = (self.font.size(text), self.font.render(text, True, self.font_color))
+            self.glyphs[text] = glyph
+            return glyph
+
+    def cell_text(self, graph, ri, ci):
+        if graph.adjacency_matrix[ri][ci] == AdjacencyMatrix.notset:
+            return None
+        vertex1 = graph.vertices_list[ri]
+        vertex2 = graph.vertices_list[ci]
+        return f'{vertex1}-{vertex2}'
+
+    def measure(self, graph):
+        """
+        Return the cell size needed for all the cells in graph.
+        """
+        cell_width = cell_height = 0
+        for ri in range(graph.nvertices):
+            for ci in range(graph.nvertices):
+                text = self.cell_text(graph, ri, ci)
+                if text is not None:
+                    (width, height), _ = self.glyph(text)
+                    cell_width = max(cell_width, width)
+                    cell_height = max(cell_height, height)
+        return (self.padding + cell_width, self.padding + cell_height)
+
+    def draw_cell(self, graph, ri, ci):
+        cell_width, cell_height = self.cell_size
+        position = (ri*cell_width, ci*cell_height)
+        self.table_image.blit(self.empty_image, position)
+        text = self.cell_text(graph, ri, ci)
+        if text is not None:
+            _, text_image = self.glyph(text)
+            cell_rect = self.empty_image.get_rect(topleft=position)
+            self.table_image.blit(text_image, text_image.get_rect(center=cell_rect.center))
+
+    def rebuild(self, graph):
+        """
+        Redraw the entire table image.
+        """
+        self.cell_size = self.measure(graph)
+        cell_width, cell_height = self.cell_size
+        self.table_image = pygame.Surface((cell_width*graph.nvertices, cell_height*graph.nvertices))
+        self.empty_image = pygame.Surface(self.cell_size)
+        pygame.draw.rect(self.empty_image, self.border_color, self.empty_image.get_rect(), 1)
+        for ri in range(graph.nvertices):
+            for ci in range(graph.nvertices):
+                self.draw_cell(graph, ri, ci)
+
+    def update(self, graph):
+        """
+        Redraw only the cells that changed since the last render. Fall back to
+        a full rebuild if that is not possible.
+        """
+        if (self.table_image is None
+                or self.labels != graph.vertices_list
+                or len(self.matrix) != graph.nvertices):
+            self.rebuild(graph)
+            return
+        dirty = [
+            (ri, ci)
+            for ri, (old_row, row) in enumerate(zip(self.matrix, graph.adjacency_matrix))
+            if old_row != row
+            for ci, (old, new) in enumerate(zip(old_row, row))
+            if old != new
+        ]
+        cell_width, cell_height = self.cell_size
+        may_shrink = False
+        for ri, ci in dirty:
+            text = self.cell_text(graph, ri, ci)
+            if text is not None:
+                (width, height), _ = self.glyph(text)
+                if (self.padding + width > cell_width
+                        or self.padding + height > cell_height):
+                    # new text does not fit
+                    self.rebuild(graph)
+                    return
+            if self.matrix[ri][ci] != AdjacencyMatrix.notset:
+                old_text = f'{self.labels[ri]}-{self.labels[ci]}'
+                (width, height), _ = self.glyph(old_text)
+                if (self.padding + width == cell_width
+                        or self.padding + height == cell_height):
+                    # old text may have been what the cells were sized for
+                    may_shrink = True
+        if may_shrink and self.measure(graph) != self.cell_size:
+            self.rebuild(graph)
+            return
+        for ri, ci in dirty:
+            self.draw_cell(graph, ri, ci)
+
+    def __call__(self, graph):
+        """
+        Return the image of the adjacency matrix, updating it if the graph has
+        changed.
+        """
+        if self.version != graph.version or self.table_image is None:
+            self.update(graph)
+            self.version = graph.version
+            self.labels = list(graph.vertices_list)
+            self.matrix = [list(row) for row in graph.adjacency_matrix]
+        return self.table_image
+
+
+class EdgeRenderer:
+    """
+    Draw the edges between vertex sprites in batches. The grouping of edges
+    into line strips is cached until the graph or the visited edge changes,
+    leaving only the endpoint lookups to do each frame.
+    """
+
+    visited_style = ((200,200,10), 4)
+    default_style = ((200,)*3, 1)
+
+    def __init__(self):
+        self.key = None
+        # (color, width) -> [(source label, [target labels]), ...]
+        self.batches = {}
+
+    def style(self, label1, label2, visited):
+        if visited and label1 in visited and label2 in visited:
+            return self.visited_style
+        return self.default_style
+
+    def update(self, graph, visited):
+        """
+        Group the graph's edges by style and by source vertex so that each
+        group is drawable as one strip, fanning out from the source and back.
+        """
+        batches = {}
+        seen = set()
+        for label1, label2, _ in graph.get_edges():
+            # undirected edges and opposing directed edges draw the same line
+            pair = frozenset((label1, label2))
+            if pair in seen:
+                continue
+            seen.add(pair)
+            style = self.style(label1, label2, visited)
+            sources = batches.setdefault(style, {})
+            sources.setdefault(label1, []).append(label2)
+        self.batches = {style: list(sources.items()) for style, sources in batches.items()}
+
+    def __call__(self, surface, graph, sprites_by_label, visited):
+        """
+        Draw edges and return a list of the rects drawn to.
+        """
+        key = (graph.version, visited)
+        if key != self.key:
+            self.update(graph, visited)
+            self.key = key
+        rects = []
+        for (color, width), sources in self.batches.items():
+            for source, targets in sources:
+                center = sprites_by_label[source].rect.center
+                points = [center]
+                for target in targets:
+                    points.append(sprites_by_label[target].rect.center)
+                    points.append(center)
+                rects.append(pygame.draw.lines(surface, color, False, points, width))
+        return rects
+
+
+class FrameTimer:
+    """
+    Accumulate wall clock time spent in the phases of each frame.
+    """
+
+    def __init__(self):
+        # phase name -> list of seconds, one per frame
+        self.phases = {}
+        self.frames = []
+        self.frame_start = None
+        self.lap_start = None
+
+    def start(self):
+        self.frame_start = self.lap_start = time.perf_counter()
+
+    def lap(self, phase):
+        """
+        Record the time since the last lap as phase.
+        """
+        now = time.perf_counter()
+        self.phases.setdefault(phase, []).append(now - self.lap_start)
+        self.lap_start = now
+
+    def stop(self):
+        now = time.perf_counter()
+        self.frames.append(now - self.frame_start)
+        self.lap_start = now
+
+    def report(self, percentiles=(50, 90, 99)):
+        """
+        Return lines of text describing the timing of phases and frames in
+        milliseconds.
+        """
+        def ms(seconds):
+            return f'{seconds*1000:9.3f}'
+
+        lines = [f'{len(self.frames)} frames']
+        lines.append(f'{"phase":<20} {"mean ms":>9} {"total ms":>9}')
+        for phase, seconds in self.phases.items():
+            lines.append(f'{phase:<20} {ms(statistics.fmean(seconds))} {ms(sum(seconds))}')
+        if self.frames:
+            lines.append(f'{"frame":<20} {ms(statistics.fmean(self.frames))} {ms(sum(self.frames))}')
+            for p, seconds in zip(percentiles, percentile(self.frames, percentiles)):
+                lines.append(f'{f"frame p{p}":<20} {ms(seconds)}')
+        return lines
+
+
+def percentile(values, percentiles):
+    """
+    Return the nearest-rank percentiles of values.
+    """
+    values = sorted(values)
+    n = len(values)
+    return [values[max(0, math.ceil(p / 100 * n) - 1)] for p in percentiles]
+
+def loop(graph, commands, frames=None, timer=None, full_redraw=False):
+    """
+    Run the demo until quit or, if given, the number of frames have been
+    drawn. Optionally record the time spent in each phase with timer.
+    Optionally clear and update the whole screen every frame instead of only
+    the rects drawn to.
     """
-    table = [[None]*graph.nvertices for _ in range(graph.nvertices)]
-
-    # compute sizes
-    for ri, row in enumerate(graph.adjacency_matrix):
-        for ci, col in enumerate(row):
-            vertex1 = graph.vertices_list[ri]
-            vertex2 = graph.vertices_list[ci]
-            if col == AdjacencyMatrix.notset:
-                size = (0, 0)
-                text = None
-            else:
-                text = f'{vertex1}-{vertex2}'
-                size = font.size(text)
-            table[ri][ci] = (text, size)
-
-    cell_width = padding + max(
-        (max(width for (text, (width, height)) in row) for row in table), default=0)
-    cell_height = padding + max(
-        (height for row in table for (text, (width, height)) in row), default=0)
-    cell_size = (cell_width, cell_height)
-
-    table_image = pygame.Surface((cell_width*graph.nvertices, cell_height*graph.nvertices))
-    empty_image = pygame.Surface(cell_size)
-    pygame.draw.rect(empty_image, border_color, empty_image.get_rect(), 1)
-
-    for ri, row in enumerate(table):
-        for ci, (text, (width, height)) in enumerate(row):
-            if text is None:
-                image = empty_image
-            else:
-                image = pygame.Surface(cell_size)
-                pygame.draw.rect(image, border_color, image.get_rect(), 1)
-                text_image = font.render(text, True, font_color)
-                image.blit(text_image, text_image.get_rect(center=image.get_rect().center))
-            table_image.blit(image, (ri*cell_width,  ci*cell_height))
-    return table_image
-
-def loop(graph, commands):
     framerate = 60
 
     command_animation = Animation(duration=framerate * .50)
@@ -109,7 +320,18 @@ def loop(graph, commands):
     font = pygame.font.Font(None, 40)
     small_font = pygame.font.Font(None, 40)
     clock = pygame.time.Clock()
-    group = pygame.sprite.Group()
+    matrix_renderer = MatrixRenderer(
+        small_font,
+        padding=40,
+        font_color=(100,)*3,
+        border_color=(100,)*3,
+    )
+    edge_renderer = EdgeRenderer()
+    last_table_version = None
+    last_table_rect = None
+    last_dirty = None
+    # draw returns the rects drawn to
+    group = pygame.sprite.RenderUpdates()
     sprites_by_label = {}
 
     dragging = None
@@ -117,8 +339,17 @@ def loop(graph, commands):
     hovering = None
     running = True
     while running:
+        if frames is not None:
+            if frames == 0:
+                break
+            frames -= 1
         # tick
-        elapsed = clock.tick(framerate)
+        if timer is None:
+            elapsed = clock.tick(framerate)
+        else:
+            # measuring, run as fast as possible
+            elapsed = clock.tick()
+            timer.start()
         # events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -180,6 +411,8 @@ def loop(graph, commands):
                 sprite.rect.center = (cx, cy)
                 sprite.center = pygame.Vector2(sprite.rect.center)
             last_vertices = graph.vertices.copy()
+        if timer is not None:
+            timer.lap('events and commands')
         # update - detect collisions
         collisions = []
         _sprites = group.sprites()
@@ -190,6 +423,8 @@ def loop(graph, commands):
                 dist = math.dist(sprite1.center, sprite2.center)
                 if dist == 0 or dist <= (sprite1.radius_border + sprite2.radius_border):
                     collisions.append((sprite1, sprite2))
+        if timer is not None:
+            timer.lap('collision detection')
         # update - resolve collisions
         for sprite1, sprite2 in collisions:
             dy = sprite2.center.y - sprite1.center.y
@@ -205,39 +440,47 @@ def loop(graph, commands):
 
             sprite1.rect.center = sprite1.center
             sprite2.rect.center = sprite2.center
-        # draw
-        screen.blit(background, (0,0))
+        if timer is not None:
+            timer.lap('collision resolution')
+        # draw - clear only what was drawn last frame
+        if last_dirty is None:
+            screen.blit(background, (0,0))
+        else:
+            for rect in last_dirty:
+                screen.blit(background, rect, rect)
+        dirty = []
 
         # TODO: draw history of commands like scrollback like command line.
 
         # draw - matrix table
-        table_image = render_matrix(
-            small_font,
-            graph,
-            padding=40,
-            font_color=(100,)*3,
-            border_color=(100,)*3,
-        )
-        screen.blit(table_image, table_image.get_rect(center=frame.center))
+        if timer is not None:
+            timer.lap('clear')
+        table_image = matrix_renderer(graph)
+        table_rect = screen.blit(table_image, table_image.get_rect(center=frame.center))
+        if graph.version != last_table_version or table_rect != last_table_rect:
+            # table changed, include old and new extents
+            dirty.append(table_rect)
+            if last_table_rect is not None:
+                dirty.append(last_table_rect)
+            last_table_version = graph.version
+            last_table_rect = table_rect
+
+        if timer is not None:
+            timer.lap('matrix render')
 
         # draw - edge lines
-        for label1, label2, _ in graph.get_edges():
-            sprite1 = sprites_by_label[label1]
-            sprite2 = sprites_by_label[label2]
-            if visited and sprite1.label in visited and sprite2.label in visited:
-                color = (200,200,10)
-                width = 4
-            else:
-                color = (200,)*3
-                width = 1
-            pygame.draw.line(screen, color, sprite1.rect.center, sprite2.rect.center, width)
+        dirty.extend(edge_renderer(screen, graph, sprites_by_label, visited))
+        if timer is not None:
+            timer.lap('edge draw')
 
         # draw - sprites
-        group.draw(screen)
+        dirty.extend(group.draw(screen))
+        if timer is not None:
+            timer.lap('sprite draw')
 
         # draw - hovering cursor
         if hovering:
-            pygame.draw.circle(screen, (200,30,30), hovering.rect.center, hovering.radius*1.5, 1)
+            dirty.append(pygame.draw.circle(screen, (200,30,30), hovering.rect.center, hovering.radius*1.5, 1))
 
         # draw - visited
         if visited is not None:
@@ -247,9 +490,18 @@ def loop(graph, commands):
                         color = (200,10,10)
                     else:
                         color = (10,200,10)
-                    pygame.draw.circle(screen, color, sprite.rect.center, sprite.radius*2, 4)
-
-        pygame.display.flip()
+                    dirty.append(pygame.draw.circle(screen, color, sprite.rect.center, sprite.radius*2, 4))
+
+        if last_dirty is None:
+            pygame.display.flip()
+        else:
+            # update what was drawn this frame and what was erased from last
+            pygame.display.update(last_dirty + dirty)
+        if not full_redraw:
+            last_dirty = dirty
+        if timer is not None:
+            timer.lap('display update')
+            timer.stop()
 
 class Visit:
 
@@ -311,8 +563,24 @@ def main(argv=None):
     """
     parser = argparse.ArgumentParser(description=main.__doc__)
     parser.add_argument('graph', nargs='+', type=edge_or_vertex)
+    parser.add_argument(
+        '--headless',
+        action='store_true',
+        help='Run without a window and report timing. Requires --frames.',
+    )
+    parser.add_argument(
+        '--frames',
+        type=int,
+        help='Stop after this many frames.',
+    )
     args = parser.parse_args(argv)
 
+    if args.headless:
+        if args.frames is None:
+            parser.error('--headless requires --frames')
+        # must be set before the display is initialized
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
     # create commands to build the graph in an animated fashion
     vertices, edges = make_graph_args(args.graph)
 
@@ -328,7 +596,13 @@ def main(argv=None):
     #
     visit = Visit(graph, 60)
     commands = chain(commands, repeat((visit,)))
-    loop(graph, commands)
+    if args.headless:
+        timer = FrameTimer()
+    else:
+        timer = None
+    loop(graph, commands, frames=args.frames, timer=timer)
+    if timer is not None:
+        print('\n'.join(timer.report()))
 
 if __name__ == '__main__':
     main()
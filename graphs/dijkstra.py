@@ -1,45 +1,111 @@
 # https://en.wikipedia.org/wiki/Dijkstra%27s_algorithm
+import heapq
 import math
 
-def dijkstra(graph, source):
-    """
-    :param graph:
-    :param source: starting vertex.
-    """
-    unvisited = set(v for v in graph.get_vertices())
-    dist = {vertex: math.inf for vertex in unvisited}
-    dist[source] = 0
-    prev = {vertex: None for vertex in unvisited}
+from array import array
 
-    # assume undirected
-    weights = {(v1, v2): cost for v1, v2, cost in graph.get_edges()}
-    print(weights)
+from .labeled_array import LabeledArray
+from .labeled_array import LabeledIndexArray
 
+def dijkstra_indices(adjacency, source, stats=None, dist=None, prev=None):
+    """
+    Shortest distances from source to every vertex, using a binary heap as the
+    priority queue. Vertices are dense integer indices.
+
+    :param adjacency: outgoing edges by vertex index, a list of lists of
+                      (index, cost), like AdjacencyMatrix.get_adjacency.
+    :param source: index of starting vertex.
+    :param stats: Optional graphs.stats.Stats to count operations with.
+    :param dist: Optional array('d') of a length of the number of vertices
+                 to write dist to instead of a new one. Any writable buffer
+                 of that format, like a memoryview of
+                 multiprocessing.shared_memory cast to 'd', shares the result
+                 without a copy.
+    :param prev: Optional array('l') to write prev to, like dist.
+    :return: tuple of arrays (dist, prev) by vertex index. dist is
+             array('d') of total cost from source, math.inf if unreachable.
+             prev is array('l') of the previous vertex index on the shortest
+             path, -1 for source and unreachable.
+    """
     # good graphics
     # https://favtutor.com/blogs/dijkstras-algorithm-cpp
+    n = len(adjacency)
+    if dist is None:
+        dist = array('d', [math.inf]) * n
+    else:
+        check_length(dist, n)
+        dist[:] = array('d', [math.inf]) * n
+    if prev is None:
+        prev = array('l', [-1]) * n
+    else:
+        check_length(prev, n)
+        prev[:] = array('l', [-1]) * n
+    settled = bytearray(n)
+    dist[source] = 0
 
-    def least_weight(node):
-        key = (current, node)
-        return weights[key]
-
-    while unvisited:
-        print(unvisited)
-        adjacents = [adjacent for adjacent in graph.get_neighbors(current) if adjacent in unvisited]
-        if unvisited and not adjacents:
-            current = next(iter(unvisited))
-        else:
-            current = min(adjacents, key=least_weight, default=None)
-        unvisited.remove(current)
-        print(current)
-        continue
-        neighbors = graph.get_neighbors(current)
-        print(current, neighbors)
-        for v in graph.get_neighbors(current):
-            if v not in unvisited:
-                continue
-            alt = dist[current] + graph.get_edge(current, v)
+    heap = [(0, source)]
+    if stats is not None:
+        stats.heap_pushes += 1
+    while heap:
+        d, current = heapq.heappop(heap)
+        if stats is not None:
+            stats.heap_pops += 1
+        if settled[current]:
+            # stale entry, a shorter path was already settled
+            continue
+        settled[current] = 1
+        neighbors = adjacency[current]
+        if stats is not None:
+            stats.vertices_settled += 1
+            stats.neighbor_scans += len(neighbors)
+        for v, cost in neighbors:
+            alt = d + cost
             if alt < dist[v]:
                 dist[v] = alt
                 prev[v] = current
+                heapq.heappush(heap, (alt, v))
+                if stats is not None:
+                    stats.edges_relaxed += 1
+                    stats.heap_pushes += 1
 
     return dist, prev
+
+def check_length(buffer, n):
+    # slice assignment would resize an array instead of failing
+    if len(buffer) != n:
+        raise ValueError(f'buffer of length {len(buffer)} for {n} vertices')
+
+def dijkstra(graph, source, stats=None, dist=None, prev=None):
+    """
+    Shortest distances from source to every vertex of graph.
+
+    :param graph: object with get_vertices and get_adjacency methods, like
+                  AdjacencyMatrix.
+    :param source: starting vertex.
+    :param stats: Optional graphs.stats.Stats to count operations with.
+    :param dist: Optional buffer to write dist to, see dijkstra_indices.
+    :param prev: Optional buffer to write prev to, see dijkstra_indices.
+    :return: tuple of mappings (dist, prev), see LabeledArray. dist maps
+             vertex to total cost from source, math.inf if unreachable. prev
+             maps vertex to the previous vertex on its shortest path, None for
+             source and unreachable.
+    """
+    # copied, the results should not change with the graph
+    labels = list(graph.get_vertices())
+    index = {label: i for i, label in enumerate(labels)}
+    dist, prev = dijkstra_indices(graph.get_adjacency(), index[source], stats, dist, prev)
+    return (LabeledArray(dist, labels, index), LabeledIndexArray(prev, labels, index))
+
+def shortest_path(prev, source, target):
+    """
+    Vertices of the shortest path from source to target using prev from
+    dijkstra, empty if target is unreachable.
+    """
+    path = [target]
+    while path[-1] != source:
+        vertex = prev[path[-1]]
+        if vertex is None:
+            return []
+        path.append(vertex)
+    path.reverse()
+    return path
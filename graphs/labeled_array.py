@@ -0,0 +1,50 @@
+from collections.abc import Mapping
+
+class LabeledArray(Mapping):
+    """
+    Read-only mapping of vertex label to the value at the vertex's index in
+    an array. Algorithms work on dense integer vertex indices and keep their
+    results in arrays; this gives them back by label without copying.
+
+    The array is available as the array attribute. It supports the buffer
+    protocol, for example to copy into multiprocessing.shared_memory, or it
+    may be a memoryview of shared memory written to by the algorithm.
+    """
+
+    def __init__(self, array, labels, index=None):
+        """
+        :param array: values by vertex index.
+        :param labels: vertex labels by index.
+        :param index: Optional dict of label to index. Default: made from
+                      labels.
+        """
+        self.array = array
+        self.labels = labels
+        if index is None:
+            index = {label: i for i, label in enumerate(labels)}
+        self.index = index
+
+    def __getitem__(self, label):
+        return self.array[self.index[label]]
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({dict(self)})'
+
+
+class LabeledIndexArray(LabeledArray):
+    """
+    LabeledArray whose values are themselves vertex indices, given back as
+    labels. Negative indices mean no vertex and are given as None.
+    """
+
+    def __getitem__(self, label):
+        i = self.array[self.index[label]]
+        if i < 0:
+            return None
+        return self.labels[i]
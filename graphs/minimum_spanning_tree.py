@@ -0,0 +1,149 @@
+# https://en.wikipedia.org/wiki/Minimum_spanning_tree
+# https://en.wikipedia.org/wiki/Kruskal%27s_algorithm
+# https://en.wikipedia.org/wiki/Prim%27s_algorithm
+import heapq
+
+class DisjointSet:
+    """
+    Union-find over hashable items with path compression and union by rank,
+    making find and union nearly constant time.
+    """
+
+    def __init__(self, items=()):
+        self.parent = {}
+        self.rank = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.rank[item] = 0
+
+    def find(self, item):
+        """
+        Return the representative item of the set containing item.
+        """
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # path compression, point everything on the way directly at root
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, item1, item2):
+        """
+        Merge the sets containing item1 and item2. Return False if they were
+        already the same set.
+        """
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+        if root1 == root2:
+            return False
+        # union by rank, attach the shorter tree under the taller
+        if self.rank[root1] < self.rank[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        if self.rank[root1] == self.rank[root2]:
+            self.rank[root1] += 1
+        return True
+
+
+def undirected_edges(graph):
+    """
+    Edges of graph with direction ignored, each pair of vertices once, keeping
+    the least cost. AdjacencyMatrix.get_edges lists undirected edges both
+    ways.
+    """
+    costs = {}
+    for v1, v2, cost in graph.get_edges():
+        if v1 == v2:
+            continue
+        if (v2, v1) in costs:
+            v1, v2 = v2, v1
+        if (v1, v2) not in costs or cost < costs[(v1, v2)]:
+            costs[(v1, v2)] = cost
+    return [(v1, v2, cost) for (v1, v2), cost in costs.items()]
+
+def kruskal(graph, edges=None):
+    """
+    Minimum spanning forest of graph by Kruskal's algorithm, in O(E log E) for
+    sorting the edges once.
+
+    :param edges: Optional result of undirected_edges(graph).
+    :return: list of edges (vertex1, vertex2, cost).
+    """
+    if edges is None:
+        edges = undirected_edges(graph)
+    vertices = graph.get_vertices()
+    components = DisjointSet(vertices)
+    tree = []
+    for v1, v2, cost in sorted(edges, key=lambda edge: edge[2]):
+        if components.union(v1, v2):
+            tree.append((v1, v2, cost))
+            if len(tree) == len(vertices) - 1:
+                break
+    return tree
+
+def prim(graph, edges=None):
+    """
+    Minimum spanning forest of graph by lazy Prim's algorithm, growing each
+    tree from the cheapest edge leaving it on a binary heap.
+
+    :param edges: Optional result of undirected_edges(graph).
+    :return: list of edges (vertex1, vertex2, cost).
+    """
+    if edges is None:
+        edges = undirected_edges(graph)
+    adjacent = {vertex: [] for vertex in graph.get_vertices()}
+    for v1, v2, cost in edges:
+        adjacent[v1].append((cost, v2))
+        adjacent[v2].append((cost, v1))
+
+    in_tree = set()
+    tree = []
+    # counter breaks ties without comparing vertices
+    counter = 0
+    for root in adjacent:
+        if root in in_tree:
+            continue
+        in_tree.add(root)
+        heap = []
+        for cost, v in adjacent[root]:
+            counter += 1
+            heap.append((cost, counter, root, v))
+        heapq.heapify(heap)
+        while heap:
+            cost, _, v1, v2 = heapq.heappop(heap)
+            if v2 in in_tree:
+                # lazy, edge became internal after it was pushed
+                continue
+            in_tree.add(v2)
+            tree.append((v1, v2, cost))
+            for next_cost, v in adjacent[v2]:
+                if v not in in_tree:
+                    counter += 1
+                    heapq.heappush(heap, (next_cost, counter, v2, v))
+    return tree
+
+# edges over possible edges above which prim is used
+dense = 0.5
+
+def minimum_spanning_tree(graph, engine=None):
+    """
+    Minimum spanning forest of graph, ignoring edge direction.
+
+    :param engine: Optional kruskal or prim. Default: prim for dense graphs,
+                   kruskal otherwise.
+    :return: list of edges (vertex1, vertex2, cost).
+    """
+    edges = undirected_edges(graph)
+    if engine is None:
+        n = len(graph.get_vertices())
+        possible = n * (n - 1) // 2
+        if possible and len(edges) / possible > dense:
+            engine = prim
+        else:
+            engine = kruskal
+    return engine(graph, edges)
@@ -0,0 +1,255 @@
+# Shortest path query service over TCP, one JSON object per line.
+#
+# Request:  {"id": 1, "source": "a", "targets": ["b", "c"]}
+# Response: {"id": 1, "results": {"b": {"cost": 7, "path": ["a", "c", "b"]}, ...}}
+#
+# "target" may be given instead of "targets". Costs that are whole numbers
+# are integers. Unreachable targets have cost and path null. {"id": 2, "op": "stats"} responds with counters.
+#
+# python -m graphs.server graph.json --port 8765
+#
+# where graph.json is {"vertices": ["a", ...], "edges": [["a", "b", 3], ...]}
+# and edges are directed.
+import argparse
+import asyncio
+import collections
+import json
+import math
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .adjacency_matrix import AdjacencyMatrix
+from .dijkstra import dijkstra
+from .dijkstra import shortest_path
+
+class Counters:
+    """
+    Latency and throughput of a QueryServer.
+    """
+
+    def __init__(self, latency_window=1000):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        # dijkstra runs, one per distinct source in flight
+        self.computations = 0
+        # requests that waited on a computation already running
+        self.coalesced = 0
+        # seconds of the most recent requests
+        self.latencies = collections.deque(maxlen=latency_window)
+
+    def as_dict(self):
+        elapsed = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return latencies[max(0, math.ceil(p / 100 * len(latencies)) - 1)]
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'computations': self.computations,
+            'coalesced': self.coalesced,
+            'requests_per_second': self.requests / elapsed if elapsed else 0,
+            'latency_p50': percentile(50),
+            'latency_p99': percentile(99),
+        }
+
+
+class QueryServer:
+    """
+    Answer shortest path queries on graph without blocking the event loop.
+    Dijkstra runs in an executor, once for any number of concurrent requests
+    from the same source, and one run answers all the targets of a request.
+    """
+
+    def __init__(self, graph, executor=None):
+        """
+        :param graph: graph for dijkstra, like AdjacencyMatrix.
+        :param executor: Optional concurrent.futures executor to run dijkstra
+                         in. Default: a ThreadPoolExecutor.
+        """
+        self.graph = graph
+        if executor is None:
+            executor = ThreadPoolExecutor()
+        self.executor = executor
+        self.counters = Counters()
+        # source -> asyncio future of (dist, prev) being computed
+        self.in_flight = {}
+        self.vertices = set(graph.get_vertices())
+
+    async def shortest(self, source):
+        """
+        Return dijkstra's (dist, prev) for source, sharing a computation
+        already running for it. Cancelling one caller does not cancel the
+        computation for the others.
+        """
+        future = self.in_flight.get(source)
+        if future is not None:
+            self.counters.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, dijkstra, self.graph, source)
+            self.in_flight[source] = future
+            self.counters.computations += 1
+
+            def done(future):
+                if self.in_flight.get(source) is future:
+                    del self.in_flight[source]
+                # retrieve the exception, in case every caller was cancelled
+                if not future.cancelled():
+                    future.exception()
+
+            future.add_done_callback(done)
+        return await asyncio.shield(future)
+
+    async def query(self, source, targets):
+        """
+        Return dict of target -> {"cost": cost, "path": path} from source.
+        """
+        for vertex in (source, *targets):
+            if vertex not in self.vertices:
+                raise KeyError(vertex)
+        dist, prev = await self.shortest(source)
+        results = {}
+        for target in targets:
+            if dist[target] == math.inf:
+                results[target] = {'cost': None, 'path': None}
+            else:
+                cost = dist[target]
+                # dist is floats, whole costs are given as integers
+                if cost.is_integer():
+                    cost = int(cost)
+                path = shortest_path(prev, source, target)
+                results[target] = {'cost': cost, 'path': path}
+        return results
+
+    async def respond(self, request):
+        """
+        Return the response object for a request object.
+        """
+        if request.get('op') == 'stats':
+            return {'stats': self.counters.as_dict()}
+        if 'targets' in request:
+            targets = request['targets']
+        else:
+            targets = [request['target']]
+        return {'results': await self.query(request['source'], targets)}
+
+    async def handle(self, reader, writer):
+        """
+        Serve one connection. Requests on a connection are answered
+        concurrently, possibly out of order, use "id" to match them.
+        """
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def send(response):
+            async with lock:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+
+        def spawn(coroutine):
+            task = asyncio.create_task(coroutine)
+            tasks.add(task)
+            task.add_done_callback(done)
+
+        def done(task):
+            tasks.discard(task)
+            # retrieve the exception, a failed write fails only its task
+            if not task.cancelled():
+                task.exception()
+
+        def error_response(error):
+            self.counters.errors += 1
+            return {'error': f'{error.__class__.__name__}: {error}'}
+
+        async def answer(line):
+            start = time.perf_counter()
+            self.counters.requests += 1
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get('id')
+                response = await self.respond(request)
+            except Exception as error:
+                # always answer, whatever went wrong
+                response = error_response(error)
+            response['id'] = request_id
+            await send(response)
+            self.counters.latencies.append(time.perf_counter() - start)
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError as error:
+                    # line longer than the stream limit, where the next
+                    # request starts is lost, answer and hang up
+                    self.counters.requests += 1
+                    response = error_response(error)
+                    response['id'] = None
+                    spawn(send(response))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                spawn(answer(line))
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=0, limit=2**16):
+        """
+        Return a started asyncio.Server. Port zero picks a free port.
+
+        :param limit: Optional longest request line in bytes. Longer lines get
+                      an error response and the connection is closed.
+        """
+        return await asyncio.start_server(self.handle, host, port, limit=limit)
+
+
+def load_graph(path):
+    """
+    AdjacencyMatrix from a JSON file of vertices and directed edges.
+    """
+    with open(path) as graph_file:
+        data = json.load(graph_file)
+    graph = AdjacencyMatrix(len(data['vertices']))
+    for index, vertex in enumerate(data['vertices']):
+        graph.set_vertex(index, vertex)
+    for v1, v2, cost in data['edges']:
+        graph.set_edge(v1, v2, directed=True, cost=cost)
+    return graph
+
+async def serve(graph, host, port):
+    query_server = QueryServer(graph)
+    server = await query_server.start(host, port)
+    for sock in server.sockets:
+        print('serving on', sock.getsockname())
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    """
+    Serve shortest path queries on a graph.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('graph', help='JSON file of vertices and edges.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    graph = load_graph(args.graph)
+    try:
+        asyncio.run(serve(graph, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
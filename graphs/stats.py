@@ -0,0 +1,85 @@
+import cProfile
+import pstats
+import tracemalloc
+
+class Stats:
+    """
+    Operation counters, optionally given to graph algorithms and graph classes
+    which then count what they do. Code that counts checks for None so there
+    is only the cost of the check when not counting.
+    """
+    counters = (
+        'vertices_settled',
+        'edges_relaxed',
+        'heap_pushes',
+        'heap_pops',
+        'neighbor_scans',
+        'edge_scans',
+    )
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # vertices whose shortest distance is final
+        self.vertices_settled = 0
+        # edges that improved the distance to their vertex
+        self.edges_relaxed = 0
+        self.heap_pushes = 0
+        self.heap_pops = 0
+        # outgoing edges examined from settled vertices
+        self.neighbor_scans = 0
+        # matrix cells examined looking for edges
+        self.edge_scans = 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.counters}
+
+    def __repr__(self):
+        counters = ', '.join(f'{name}={value}' for name, value in self.as_dict().items())
+        return f'{self.__class__.__name__}({counters})'
+
+
+class Capture:
+    """
+    Context manager optionally profiling with cProfile and tracing memory
+    allocations with tracemalloc while inside.
+
+    with Capture(profile=True, memory=True) as capture:
+        dijkstra(graph, source)
+    capture.profile_stats.sort_stats('cumulative').print_stats(10)
+    print(capture.memory_peak)
+    """
+
+    def __init__(self, profile=False, memory=False):
+        self.profile = profile
+        self.memory = memory
+        self.profiler = None
+        # pstats.Stats after exit, if profiling
+        self.profile_stats = None
+        # tracemalloc snapshot and peak traced bytes after exit, if tracing.
+        # If already tracing on enter, the peak is since tracing started.
+        self.memory_snapshot = None
+        self.memory_peak = None
+        # stop tracing on exit only if it was not already tracing
+        self.started_tracing = False
+
+    def __enter__(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.profile:
+            self.profiler.disable()
+            self.profile_stats = pstats.Stats(self.profiler)
+        if self.memory:
+            self.memory_snapshot = tracemalloc.take_snapshot()
+            _, self.memory_peak = tracemalloc.get_traced_memory()
+            if self.started_tracing:
+                tracemalloc.stop()
+                self.started_tracing = False
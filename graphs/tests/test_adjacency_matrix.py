@@ -63,6 +63,33 @@ class TestAdjacencyMatrixSample(unittest.TestCase):
         # TODO:
         # see test_sample_remove_vertex
 
+    def test_sample_version(self):
+        """
+        Mutations bump the version, queries do not.
+        """
+        version = self.graph.version
+        self.graph.get_edges()
+        self.assertEqual(self.graph.version, version)
+        self.graph.set_edge('a', 'b')
+        self.assertGreater(self.graph.version, version)
+        version = self.graph.version
+        self.graph.remove_edge('a', 'b')
+        self.assertGreater(self.graph.version, version)
+
+    def test_sample_version_unchanged(self):
+        """
+        Setting what is already set is not a change.
+        """
+        self.graph.set_edge('a', 'b', cost=5)
+        version = self.graph.version
+        self.graph.set_edge('a', 'b', cost=5)
+        self.graph.set_vertex(0, 'a')
+        self.graph.remove_edge('a', 'd')
+        self.assertEqual(self.graph.version, version)
+        # directed over an undirected edge of the same cost
+        self.graph.set_edge('b', 'a', directed=True, cost=5)
+        self.assertEqual(self.graph.version, version)
+
 
 class TestAdjacencyMatrixClaw(unittest.TestCase):
     """
@@ -45,6 +45,33 @@ class TestBinaryTreeList(unittest.TestCase):
         value = self.tree._tree[child_index]
         self.assertEqual(value, 'C')
 
+    def test_child_past_end(self):
+        "Test children past the end of the list are missing."
+        tree = BinaryTree('A', 'B', 'C', 'D', 'E', 'F', 'G')
+        self.assertEqual(tree.right_child_index(2), 6)
+        self.assertIsNone(tree.left_child_index(3))
+        self.assertIsNone(self.tree.left_child_index(6))
+
+    def test_preorder(self):
+        "Test node-left-right traversal."
+        self.assertEqual(
+            self.tree.preorder(),
+            ['A', 'B', 'D', 'X', 'W', 'Z', 'G', 'H', 'C', 'Y', 'I', 'J', 'F'])
+        self.assertEqual(self.tree.preorder(2), ['C', 'Y', 'I', 'J', 'F'])
+        self.assertEqual(BinaryTree().preorder(), [])
+
+    def test_level_order(self):
+        "Test level by level traversal."
+        self.assertEqual(self.tree.level_order(), self.tree._tree)
+        self.assertEqual(BinaryTree().level_order(), [])
+
+    def test_missing_parent(self):
+        "Test children of missing nodes are skipped by both traversals."
+        # D and E are children of the missing B
+        tree = BinaryTree('A', None, 'C', 'D', 'E', None, 'F')
+        self.assertEqual(tree.preorder(), ['A', 'C', 'F'])
+        self.assertEqual(tree.level_order(), ['A', 'C', 'F'])
+
     def test_count(self):
         "Test counting the number of nodes at a given level."
         # better name than "count"
@@ -0,0 +1,98 @@
+import math
+import unittest
+
+from graphs.adjacency_matrix import AdjacencyMatrix
+from graphs.centrality import SparseLinks
+from graphs.centrality import eigenvector_centrality
+from graphs.centrality import pagerank
+from matrix import dotproduct
+
+def make_graph(labels, edges):
+    graph = AdjacencyMatrix(len(labels))
+    for index, label in enumerate(labels):
+        graph.set_vertex(index, label)
+    for v1, v2 in edges:
+        graph.set_edge(v1, v2, directed=True)
+    return graph
+
+def dense_pagerank(graph, damping, iterations):
+    # google matrix G[i][j], probability of going from j to i
+    n = graph.nvertices
+    matrix = graph.get_matrix()
+    G = [[0] * n for _ in range(n)]
+    for j in range(n):
+        links = [i for i in range(n) if matrix[j][i] != graph.notset]
+        for i in range(n):
+            if links:
+                linked = (1 / len(links)) if i in links else 0
+            else:
+                linked = 1 / n
+            G[i][j] = (1 - damping) / n + damping * linked
+    ranks = [[1 / n] for _ in range(n)]
+    for _ in range(iterations):
+        ranks = dotproduct(G, ranks)
+    return [rank for rank, in ranks]
+
+class TestPageRank(unittest.TestCase):
+
+    def setUp(self):
+        # d is dangling, no outgoing edges
+        self.graph = make_graph(
+            'abcd', [('a', 'b'), ('a', 'c'), ('b', 'c'), ('c', 'a'), ('c', 'd')])
+
+    def test_sparse_links(self):
+        links = SparseLinks(self.graph, normalize=True)
+        self.assertEqual(links.out_degree, [2, 1, 2, 0])
+        self.assertEqual(links.dangling, [3])
+        # column sums are one, except dangling
+        sums = [0] * 4
+        for row in links.rows:
+            for j, value in row:
+                sums[j] += value
+        self.assertEqual(sums, [1, 1, 1, 0])
+
+    def test_pagerank(self):
+        result = pagerank(self.graph)
+        self.assertTrue(result.converged)
+        self.assertEqual(len(result.residuals), result.iterations)
+        self.assertAlmostEqual(sum(result.scores.values()), 1)
+        expect = dense_pagerank(self.graph, 0.85, 200)
+        for label, rank in zip('abcd', expect):
+            self.assertAlmostEqual(result.scores[label], rank)
+
+    def test_pagerank_max_iterations(self):
+        result = pagerank(self.graph, max_iterations=3)
+        self.assertFalse(result.converged)
+        self.assertEqual(result.iterations, 3)
+
+    def test_pagerank_no_iterations(self):
+        result = pagerank(self.graph, max_iterations=0)
+        self.assertEqual((result.iterations, result.residuals), (0, []))
+        self.assertFalse(result.converged)
+        self.assertEqual(list(result.scores.values()), [0.25] * 4)
+
+
+class TestEigenvectorCentrality(unittest.TestCase):
+
+    def test_claw(self):
+        graph = make_graph('abcd', [])
+        for label in 'abc':
+            graph.set_edge(label, 'd')
+        result = eigenvector_centrality(graph)
+        self.assertTrue(result.converged)
+        scores = result.scores
+        # center is the largest, leaves equal
+        self.assertAlmostEqual(scores['d'], math.sqrt(2) / 2)
+        self.assertAlmostEqual(scores['a'], scores['b'])
+        self.assertAlmostEqual(scores['a'], math.sqrt(6) / 6)
+
+    def test_no_iterations(self):
+        graph = make_graph('ab', [('a', 'b')])
+        result = eigenvector_centrality(graph, max_iterations=0)
+        self.assertEqual((result.iterations, result.residuals), (0, []))
+        self.assertFalse(result.converged)
+        self.assertEqual(result.scores, {'a': 0.5, 'b': 0.5})
+
+
+if __name__ == '__main__':
+    unittest.main()
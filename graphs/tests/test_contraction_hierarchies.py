@@ -0,0 +1,114 @@
+import math
+import os
+import random
+import tempfile
+import unittest
+
+from graphs.adjacency_matrix import AdjacencyMatrix
+from graphs.contraction_hierarchies import ContractionHierarchy
+from graphs.dijkstra import dijkstra
+from graphs.dijkstra import shortest_path
+from graphs.stats import Stats
+
+def random_graph(n, seed, cost=None, density=0.05):
+    # random real costs by default so that shortest paths are unique
+    rng = random.Random(seed)
+    if cost is None:
+        cost = rng.random
+    graph = AdjacencyMatrix(n)
+    for index in range(n):
+        graph.set_vertex(index, f'v{index}')
+    for i in range(n):
+        for j in range(n):
+            if i != j and rng.random() < density:
+                directed = rng.random() < 0.5
+                graph.set_edge(f'v{i}', f'v{j}', directed=directed, cost=cost())
+    return graph
+
+class TestContractionHierarchy(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = random_graph(60, seed=0)
+        self.hierarchy = ContractionHierarchy.from_graph(self.graph)
+
+    def assertSameAsDijkstra(self, hierarchy):
+        for source in self.graph.get_vertices():
+            dist, prev = dijkstra(self.graph, source)
+            for target in self.graph.get_vertices():
+                cost, path = hierarchy.query(source, target)
+                self.assertTrue(math.isclose(cost, dist[target]) or cost == dist[target])
+                self.assertEqual(path, shortest_path(prev, source, target))
+
+    def test_query(self):
+        "Same distances and paths as dijkstra for all pairs."
+        self.assertSameAsDijkstra(self.hierarchy)
+
+    def test_query_ties(self):
+        """
+        With small integer costs there are many equally short paths. The
+        hierarchy may return a different one than dijkstra, but of the same
+        cost and made of edges of the graph.
+        """
+        rng = random.Random(1)
+        graph = random_graph(60, seed=1, cost=lambda: rng.randint(1, 10), density=0.1)
+        hierarchy = ContractionHierarchy.from_graph(graph)
+        for source in graph.get_vertices():
+            dist, _ = dijkstra(graph, source)
+            for target in graph.get_vertices():
+                cost, path = hierarchy.query(source, target)
+                self.assertEqual(cost, dist[target])
+                if cost == math.inf:
+                    self.assertEqual(path, [])
+                    continue
+                self.assertEqual((path[0], path[-1]), (source, target))
+                edge_costs = [graph.get_edge(v1, v2) for v1, v2 in zip(path, path[1:])]
+                self.assertNotIn(graph.notset, edge_costs)
+                self.assertEqual(sum(edge_costs), cost)
+
+    def test_query_settles_few(self):
+        stats = Stats()
+        source, target = self.graph.get_vertices()[:2]
+        self.hierarchy.query(source, target, stats=stats)
+        self.assertLess(stats.vertices_settled, self.graph.nvertices)
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hierarchy.json')
+            self.hierarchy.save(path)
+            loaded = ContractionHierarchy.load(path, self.graph)
+            self.assertSameAsDijkstra(loaded)
+            # graph changed since
+            self.graph.set_edge('v0', 'v1', cost=0.5)
+            with self.assertRaises(ValueError):
+                ContractionHierarchy.load(path, self.graph)
+
+    def test_save_load_tuples(self):
+        graph = AdjacencyMatrix(3)
+        for index, vertex in enumerate([(0, 0), (0, 1), (1, 1)]):
+            graph.set_vertex(index, vertex)
+        graph.set_edge((0, 0), (0, 1), directed=True, cost=1)
+        graph.set_edge((0, 1), (1, 1), directed=True, cost=1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hierarchy.json')
+            ContractionHierarchy.from_graph(graph).save(path)
+            loaded = ContractionHierarchy.load(path, graph)
+        self.assertEqual(loaded.query((0, 0), (1, 1)), (2, [(0, 0), (0, 1), (1, 1)]))
+
+    def test_not_json(self):
+        "Vertices need only be JSON values to save."
+        vertices = [frozenset('a'), frozenset('b')]
+        graph = AdjacencyMatrix(2)
+        for index, vertex in enumerate(vertices):
+            graph.set_vertex(index, vertex)
+        graph.set_edge(*vertices, directed=True, cost=1)
+        hierarchy = ContractionHierarchy.from_graph(graph)
+        self.assertEqual(hierarchy.query(*vertices), (1, vertices))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hierarchy.json')
+            with self.assertRaises(TypeError):
+                hierarchy.save(path)
+            self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
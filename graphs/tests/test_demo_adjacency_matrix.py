@@ -0,0 +1,67 @@
+import os
+import random
+import unittest
+
+from itertools import chain
+from itertools import repeat
+
+from graphs.adjacency_matrix import AdjacencyMatrix
+
+try:
+    # must be set before the display is initialized
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from graphs.demos import adjacency_matrix as demo
+except ImportError:
+    demo = None
+
+@unittest.skipIf(demo is None, 'requires pygame')
+class TestMatrixRenderer(unittest.TestCase):
+
+    def setUp(self):
+        demo.pygame.font.init()
+        self.font = demo.pygame.font.Font(None, 40)
+        self.graph = AdjacencyMatrix(3)
+        for index, vertex in enumerate(['a', 'b', 'wide']):
+            self.graph.set_vertex(index, vertex)
+        self.graph.set_edge('a', 'b')
+
+    def fresh_size(self):
+        return demo.MatrixRenderer(self.font, padding=10)(self.graph).get_size()
+
+    def test_grows(self):
+        renderer = demo.MatrixRenderer(self.font, padding=10)
+        renderer(self.graph)
+        self.graph.set_edge('a', 'wide')
+        self.assertEqual(renderer(self.graph).get_size(), self.fresh_size())
+
+    def test_shrinks(self):
+        self.graph.set_edge('a', 'wide')
+        renderer = demo.MatrixRenderer(self.font, padding=10)
+        grown = renderer(self.graph).get_size()
+        self.graph.remove_edge('a', 'wide')
+        size = renderer(self.graph).get_size()
+        self.assertLess(size, grown)
+        self.assertEqual(size, self.fresh_size())
+
+
+@unittest.skipIf(demo is None, 'requires pygame')
+class TestLoop(unittest.TestCase):
+
+    def run_demo(self, frames, full_redraw):
+        random.seed(0)
+        graph = AdjacencyMatrix(4)
+        commands = []
+        for index, vertex in enumerate('abcd'):
+            commands.append((graph.set_vertex, index, vertex))
+        for v1, v2 in ['ab', 'bc', 'cd', 'da']:
+            commands.append((graph.set_edge, v1, v2, True))
+        commands = chain(commands, repeat((demo.Visit(graph, 60),)))
+        # a timer runs the frames without waiting
+        demo.loop(graph, commands, frames=frames, timer=demo.FrameTimer(), full_redraw=full_redraw)
+        return demo.pygame.image.tobytes(demo.pygame.display.get_surface(), 'RGB')
+
+    def test_dirty_rects_match_full_redraw(self):
+        # while sprites are still moving apart and after
+        for frames in (100, 200, 400):
+            with self.subTest(frames=frames):
+                self.assertEqual(self.run_demo(frames, False), self.run_demo(frames, True))
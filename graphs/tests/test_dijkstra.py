@@ -1,7 +1,15 @@
+import math
+import tracemalloc
 import unittest
 
+from array import array
+from multiprocessing import shared_memory
+
 from graphs.adjacency_matrix import AdjacencyMatrix
 from graphs.dijkstra import dijkstra
+from graphs.dijkstra import dijkstra_indices
+from graphs.stats import Capture
+from graphs.stats import Stats
 
 def graph1():
     # https://favtutor.com/blogs/dijkstras-algorithm-cpp
@@ -33,9 +41,85 @@ class TestDijkstra(unittest.TestCase):
 
     def test_dijkstra(self):
         dist, prev = dijkstra(self.graph, 'a')
-        print(dist, prev)
+        self.assertEqual(dist, {'a': 0, 'b': 7, 'c': 3, 'd': 9, 'e': 5})
+        self.assertEqual(prev, {'a': None, 'b': 'c', 'c': 'a', 'd': 'b', 'e': 'c'})
+
+    def test_dijkstra_unreachable(self):
+        # nothing leads back to a
+        dist, prev = dijkstra(self.graph, 'b')
+        self.assertEqual(dist['a'], math.inf)
+        self.assertIsNone(prev['a'])
+
+    def test_dijkstra_indices(self):
+        dist, prev = dijkstra_indices(self.graph.get_adjacency(), 0)
+        self.assertEqual(dist, array('d', [0, 7, 3, 9, 5]))
+        self.assertEqual(prev, array('l', [-1, 2, 0, 1, 2]))
+
+    def test_dijkstra_shared_memory(self):
+        "Results are written to given buffers, without a copy."
+        n = self.graph.nvertices
+        itemsize = array('d').itemsize
+        memory = shared_memory.SharedMemory(create=True, size=n * itemsize * 2)
+        try:
+            dist = memory.buf[:n * itemsize].cast('d')
+            prev = memory.buf[n * itemsize:].cast('l')
+            # results of a previous run are overwritten
+            dijkstra(self.graph, 'b', dist=dist, prev=prev)
+            labeled_dist, labeled_prev = dijkstra(self.graph, 'a', dist=dist, prev=prev)
+            self.assertIs(labeled_dist.array, dist)
+            self.assertEqual(dist.tolist(), [0, 7, 3, 9, 5])
+            self.assertEqual(prev.tolist(), [-1, 2, 0, 1, 2])
+            self.assertEqual(labeled_prev['d'], 'b')
+            with self.assertRaises(ValueError):
+                dijkstra_indices(self.graph.get_adjacency(), 0, dist=dist[1:])
+            del labeled_dist, labeled_prev
+            dist.release()
+            prev.release()
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def test_dijkstra_arrays(self):
+        "Labeled results share the arrays."
+        dist, prev = dijkstra(self.graph, 'a')
+        self.assertEqual(dist.array.typecode, 'd')
+        self.assertEqual(prev.array.typecode, 'l')
+        self.assertEqual(bytes(memoryview(dist.array)), dist.array.tobytes())
+        dist.array[1] = 1
+        self.assertEqual(dist['b'], 1)
+
+    def test_dijkstra_stats(self):
+        stats = Stats()
+        self.graph.stats = stats
+        dijkstra(self.graph, 'a', stats=stats)
+        expect = {
+            'vertices_settled': 5,
+            'edges_relaxed': 6,
+            'heap_pushes': 7,
+            'heap_pops': 7,
+            'neighbor_scans': 9,
+            'edge_scans': 25,
+        }
+        self.assertEqual(stats.as_dict(), expect)
+
+    def test_dijkstra_capture(self):
+        with Capture(profile=True, memory=True) as capture:
+            dijkstra(self.graph, 'a')
+        self.assertGreater(capture.profile_stats.total_calls, 0)
+        self.assertGreater(capture.memory_peak, 0)
 
-        raise NotImplementedError
+    def test_capture_keeps_tracing(self):
+        tracemalloc.start()
+        try:
+            with Capture(memory=True) as capture:
+                dijkstra(self.graph, 'a')
+            self.assertTrue(tracemalloc.is_tracing())
+            self.assertIsNotNone(capture.memory_snapshot)
+        finally:
+            tracemalloc.stop()
+        with Capture(memory=True):
+            pass
+        self.assertFalse(tracemalloc.is_tracing())
 
 
 if __name__ == '__main__':
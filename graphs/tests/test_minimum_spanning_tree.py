@@ -0,0 +1,80 @@
+import random
+import unittest
+
+from graphs.adjacency_matrix import AdjacencyMatrix
+from graphs.minimum_spanning_tree import DisjointSet
+from graphs.minimum_spanning_tree import kruskal
+from graphs.minimum_spanning_tree import minimum_spanning_tree
+from graphs.minimum_spanning_tree import prim
+from graphs.minimum_spanning_tree import undirected_edges
+
+def total_cost(tree):
+    return sum(cost for _, _, cost in tree)
+
+class TestDisjointSet(unittest.TestCase):
+
+    def test_union_find(self):
+        components = DisjointSet('abcde')
+        self.assertTrue(components.union('a', 'b'))
+        self.assertTrue(components.union('c', 'd'))
+        self.assertTrue(components.union('b', 'd'))
+        self.assertFalse(components.union('a', 'c'))
+        self.assertEqual(components.find('a'), components.find('d'))
+        self.assertNotEqual(components.find('a'), components.find('e'))
+
+
+class TestMinimumSpanningTree(unittest.TestCase):
+
+    def setUp(self):
+        # https://en.wikipedia.org/wiki/Kruskal%27s_algorithm example
+        self.graph = AdjacencyMatrix(7)
+        for index, label in enumerate('ABCDEFG'):
+            self.graph.set_vertex(index, label)
+        edges = [
+            ('A', 'B', 7), ('A', 'D', 5), ('B', 'C', 8), ('B', 'D', 9),
+            ('B', 'E', 7), ('C', 'E', 5), ('D', 'E', 15), ('D', 'F', 6),
+            ('E', 'F', 8), ('E', 'G', 9), ('F', 'G', 11)]
+        for v1, v2, cost in edges:
+            self.graph.set_edge(v1, v2, cost=cost)
+
+    def test_undirected_edges(self):
+        # set both ways in the matrix, listed once
+        self.assertEqual(len(undirected_edges(self.graph)), 11)
+
+    def test_kruskal(self):
+        tree = kruskal(self.graph)
+        self.assertEqual(len(tree), 6)
+        self.assertEqual(total_cost(tree), 39)
+
+    def test_prim(self):
+        tree = prim(self.graph)
+        self.assertEqual(len(tree), 6)
+        self.assertEqual(total_cost(tree), 39)
+
+    def test_forest(self):
+        "Disconnected graphs give a tree per component."
+        graph = AdjacencyMatrix(4)
+        for index, label in enumerate('abcd'):
+            graph.set_vertex(index, label)
+        graph.set_edge('a', 'b', cost=1)
+        graph.set_edge('c', 'd', cost=2)
+        for engine in (kruskal, prim):
+            self.assertEqual(total_cost(engine(graph)), 3)
+
+    def test_engines_agree(self):
+        rng = random.Random(0)
+        for density in (0.1, 0.9):
+            graph = AdjacencyMatrix(40)
+            for index in range(40):
+                graph.set_vertex(index, index)
+            for i in range(40):
+                for j in range(i + 1, 40):
+                    if rng.random() < density:
+                        graph.set_edge(i, j, cost=rng.randint(1, 100))
+            expect = total_cost(kruskal(graph))
+            self.assertEqual(total_cost(prim(graph)), expect)
+            self.assertEqual(total_cost(minimum_spanning_tree(graph)), expect)
+
+
+if __name__ == '__main__':
+    unittest.main()
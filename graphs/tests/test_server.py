@@ -0,0 +1,143 @@
+import asyncio
+import json
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from graphs.server import QueryServer
+from graphs.tests.test_dijkstra import graph1
+
+class SlowExecutor(ThreadPoolExecutor):
+
+    def submit(self, fn, *args, **kwargs):
+        def slow():
+            time.sleep(0.2)
+            return fn(*args, **kwargs)
+        return super().submit(slow)
+
+
+class FailingExecutor(ThreadPoolExecutor):
+
+    def submit(self, fn, *args, **kwargs):
+        def fail():
+            raise RuntimeError('worker failed')
+        return super().submit(fail)
+
+
+class TestQueryServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.query_server = QueryServer(graph1())
+        self.server = await self.query_server.start()
+        host, port = self.server.sockets[0].getsockname()[:2]
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.server.close()
+        await self.server.wait_closed()
+        self.query_server.executor.shutdown()
+
+    async def request(self, request):
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    async def test_target(self):
+        response = await self.request({'id': 1, 'source': 'a', 'target': 'd'})
+        expect = {'id': 1, 'results': {'d': {'cost': 9, 'path': ['a', 'c', 'b', 'd']}}}
+        self.assertEqual(response, expect)
+        self.assertIsInstance(response['results']['d']['cost'], int)
+
+    async def test_targets(self):
+        response = await self.request({'id': 2, 'source': 'b', 'targets': ['a', 'e']})
+        expect = {
+            'id': 2,
+            'results': {
+                'a': {'cost': None, 'path': None},
+                'e': {'cost': 3, 'path': ['b', 'c', 'e']},
+            },
+        }
+        self.assertEqual(response, expect)
+
+    async def test_error(self):
+        response = await self.request({'id': 3, 'source': 'x', 'target': 'a'})
+        self.assertEqual(response['id'], 3)
+        self.assertIn('KeyError', response['error'])
+        response = await self.request({'id': 4, 'op': 'stats'})
+        self.assertEqual(response['stats']['errors'], 1)
+
+    async def test_coalesce(self):
+        "Concurrent queries from one source share a computation."
+        results = await asyncio.gather(
+            self.query_server.query('a', ['b']),
+            self.query_server.query('a', ['e']),
+            self.query_server.query('c', ['d']),
+        )
+        self.assertEqual(results[0]['b']['cost'], 7)
+        self.assertEqual(results[1]['e']['cost'], 5)
+        self.assertEqual(results[2]['d']['cost'], 6)
+        self.assertEqual(self.query_server.counters.computations, 2)
+        self.assertEqual(self.query_server.counters.coalesced, 1)
+        self.assertEqual(self.query_server.in_flight, {})
+
+
+class TestQueryServerExecutors(unittest.IsolatedAsyncioTestCase):
+
+    async def test_cancel_coalesced(self):
+        "Cancelling the first request does not fail requests sharing it."
+        with SlowExecutor() as executor:
+            query_server = QueryServer(graph1(), executor)
+            first = asyncio.create_task(query_server.query('a', ['b']))
+            second = asyncio.create_task(query_server.query('a', ['e']))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            results = await second
+            self.assertEqual(results['e']['cost'], 5)
+            self.assertTrue(first.cancelled())
+            self.assertEqual(query_server.counters.coalesced, 1)
+            self.assertEqual(query_server.in_flight, {})
+
+    async def test_worker_error(self):
+        "Unexpected errors still get an error response."
+        with FailingExecutor() as executor:
+            query_server = QueryServer(graph1(), executor)
+            server = await query_server.start()
+            host, port = server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(json.dumps({'id': 1, 'source': 'a', 'target': 'b'}).encode() + b'\n')
+            await writer.drain()
+            # no response at all used to hang here
+            response = json.loads(await asyncio.wait_for(reader.readline(), 5))
+            self.assertEqual(response, {'id': 1, 'error': 'RuntimeError: worker failed'})
+            self.assertEqual(query_server.in_flight, {})
+            writer.close()
+            await writer.wait_closed()
+            server.close()
+            await server.wait_closed()
+
+    async def test_line_too_long(self):
+        "A line over the limit gets an error response before hanging up."
+        query_server = QueryServer(graph1())
+        server = await query_server.start(limit=1024)
+        host, port = server.sockets[0].getsockname()[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        request = {'id': 1, 'source': 'a', 'targets': ['b'] * 1000}
+        writer.write(json.dumps(request).encode() + b'\n')
+        await writer.drain()
+        response = json.loads(await asyncio.wait_for(reader.readline(), 5))
+        self.assertIsNone(response['id'])
+        self.assertIn('error', response)
+        self.assertEqual(await asyncio.wait_for(reader.read(), 5), b'')
+        self.assertEqual(query_server.counters.errors, 1)
+        writer.close()
+        await writer.wait_closed()
+        server.close()
+        await server.wait_closed()
+        query_server.executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
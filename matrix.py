@@ -1,6 +1,13 @@
+import contextlib
+import math
+import mmap
 import operator
+import os
+import struct
+import tempfile
 import unittest
 
+from array import array
 from itertools import starmap
 from itertools import tee
 from operator import mul
@@ -40,6 +47,117 @@ class TestMatrix(unittest.TestCase):
         C = dotproduct(A,B)
         self.assertEqual(C[0][0], 83)
 
+    def test_mapped_matrix(self):
+        A = [[1,2,3],
+             [4,5,6]]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'A.matrix')
+            MappedMatrix.from_list(path, A, typecode='q').close()
+            with MappedMatrix(path) as mapped:
+                self.assertEqual((mapped.rows, mapped.cols), (2, 3))
+                self.assertEqual(mapped.typecode, 'q')
+                self.assertEqual(mapped.to_list(), A)
+                self.assertEqual(mapped[1, 2], 6)
+
+    def test_tiled_add(self):
+        A = [[3,8],
+             [4,6]]
+        B = [[4, 0],
+             [1,-9]]
+        C = [[7, 8],
+             [5,-3]]
+        with tempfile.TemporaryDirectory() as directory:
+            A = MappedMatrix.from_list(os.path.join(directory, 'A'), A, typecode='q')
+            B = MappedMatrix.from_list(os.path.join(directory, 'B'), B, typecode='q')
+            # one row at a time
+            with tiled_add(A, B, os.path.join(directory, 'C'), max_elements=6) as result:
+                self.assertEqual(result.to_list(), C)
+            A.close()
+            B.close()
+
+    def test_header_aligned(self):
+        self.assertEqual(MappedMatrix.header.size, 32)
+
+    def test_tiled_add_wide_rows(self):
+        A = [list(range(10)), list(range(10, 20))]
+        B = [[1] * 10, [2] * 10]
+        C = [[a + b for a, b in zip(*rows)] for rows in zip(A, B)]
+        with tempfile.TemporaryDirectory() as directory:
+            A = MappedMatrix.from_list(os.path.join(directory, 'A'), A, typecode='q')
+            B = MappedMatrix.from_list(os.path.join(directory, 'B'), B, typecode='q')
+            # a block is less than a row
+            with tiled_add(A, B, os.path.join(directory, 'C'), max_elements=9) as result:
+                self.assertEqual(result.to_list(), C)
+            A.close()
+            B.close()
+
+    def test_mixed_typecodes(self):
+        """
+        The result holds both operands' values, in either order.
+        """
+        cases = [
+            # (typecode, value), (typecode, value), add and dot typecodes
+            (('q', 2**40), ('f', 1.5), ('d', 'd')),
+            (('i', 2**20), ('q', 2**40), ('q', 'q')),
+            (('B', 255), ('b', -1), ('i', 'q')),
+            (('H', 1), ('B', 2), ('I', 'Q')),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            for (typecode1, value1), (typecode2, value2), (add_expect, dot_expect) in cases:
+                for (t1, v1), (t2, v2) in [((typecode1, value1), (typecode2, value2)),
+                                           ((typecode2, value2), (typecode1, value1))]:
+                    with self.subTest(typecodes=(t1, t2)):
+                        A = MappedMatrix.from_list(os.path.join(directory, 'A'), [[v1]], t1)
+                        B = MappedMatrix.from_list(os.path.join(directory, 'B'), [[v2]], t2)
+                        with tiled_add(A, B, os.path.join(directory, 'C')) as result:
+                            self.assertEqual(result.typecode, add_expect)
+                            self.assertEqual(result[0, 0], v1 + v2)
+                        with tiled_dotproduct(A, B, os.path.join(directory, 'D')) as result:
+                            self.assertEqual(result.typecode, dot_expect)
+                            self.assertEqual(result[0, 0], v1 * v2)
+                        A.close()
+                        B.close()
+
+    def test_overflow(self):
+        """
+        Integer results are wider than the elements, or fail cleanly.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            A = MappedMatrix.from_list(os.path.join(directory, 'A'), [[200]], 'B')
+            B = MappedMatrix.from_list(os.path.join(directory, 'B'), [[100]], 'B')
+            with tiled_add(A, B, os.path.join(directory, 'C')) as result:
+                self.assertEqual(result[0, 0], 300)
+            with tiled_dotproduct(A, B, os.path.join(directory, 'D')) as result:
+                self.assertEqual(result[0, 0], 20000)
+            A.close()
+            B.close()
+            A = MappedMatrix.from_list(os.path.join(directory, 'A'), [[2**40]], 'q')
+            path = os.path.join(directory, 'E')
+            with self.assertRaises(ValueError):
+                tiled_dotproduct(A, A, path)
+            self.assertFalse(os.path.exists(path))
+            A.close()
+
+    def test_tiled_dotproduct(self):
+        A = [[1,2,3],
+             [4,5,6]]
+        B = [[ 7, 8],
+             [ 9,10],
+             [11,12]]
+        C = [[ 58, 64],
+             [139,154]]
+        with tempfile.TemporaryDirectory() as directory:
+            A = MappedMatrix.from_list(os.path.join(directory, 'A'), A)
+            B = MappedMatrix.from_list(os.path.join(directory, 'B'), B)
+            # tiles smaller than the matrices
+            for max_elements in (3, 12, 1000):
+                path = os.path.join(directory, f'C{max_elements}')
+                with tiled_dotproduct(A, B, path, max_elements=max_elements) as result:
+                    self.assertEqual(result.to_list(), C)
+            A.close()
+            B.close()
+
+
 
 def add(A, B):
     """
@@ -57,6 +175,227 @@ def dotproduct(A, B):
     # TODO: performance test of this vs. that.
     return [ [sum(starmap(mul, zip(A_row, B_col))) for B_col in zip(*B)] for A_row in A]
 
+
+class MappedMatrix:
+    """
+    Matrix stored in a file and memory-mapped, for matrices too large for
+    memory. The file is a 32 byte header of magic, rows, columns and array
+    typecode followed by the elements in row-major order. The padding keeps
+    the elements aligned, for example for numpy.memmap(offset=32).
+    """
+    header = struct.Struct('<4sQQc11x')
+    magic = b'MTRX'
+
+    def __init__(self, path, writable=False):
+        """
+        Map an existing matrix file.
+        """
+        self.path = path
+        with open(path, 'r+b' if writable else 'rb') as matrix_file:
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self.mmap = mmap.mmap(matrix_file.fileno(), 0, access=access)
+        magic, self.rows, self.cols, typecode = self.header.unpack_from(self.mmap)
+        if magic != self.magic:
+            self.mmap.close()
+            raise ValueError(f'{path} is not a matrix file')
+        self.typecode = typecode.decode()
+        # flat view of the elements
+        self.data = memoryview(self.mmap)[self.header.size:].cast(self.typecode)
+
+    @classmethod
+    def create(cls, path, rows, cols, typecode='d'):
+        """
+        Create a zero-filled matrix file and map it writable.
+
+        :param typecode: Optional array typecode of the elements.
+        """
+        itemsize = array(typecode).itemsize
+        with open(path, 'wb') as matrix_file:
+            matrix_file.write(cls.header.pack(cls.magic, rows, cols, typecode.encode()))
+            matrix_file.truncate(cls.header.size + rows * cols * itemsize)
+        return cls(path, writable=True)
+
+    @classmethod
+    def from_list(cls, path, A, typecode='d'):
+        """
+        Create a matrix file from list of lists matrix A.
+        """
+        mapped = cls.create(path, len(A), len(A[0]) if A else 0, typecode)
+        for i, row in enumerate(A):
+            mapped.set_rows(i, array(typecode, row))
+        return mapped
+
+    def get_elements(self, start, stop):
+        """
+        Array of the elements start to stop, counted in row-major order.
+        """
+        values = array(self.typecode)
+        values.frombytes(self.data[start:stop].cast('B'))
+        return values
+
+    def set_elements(self, start, values):
+        """
+        Write array of elements, beginning at element start in row-major
+        order.
+        """
+        self.data[start:start + len(values)] = values
+
+    def get_rows(self, start, stop):
+        """
+        Flat array of the elements of rows start to stop.
+        """
+        return self.get_elements(start * self.cols, stop * self.cols)
+
+    def set_rows(self, start, values):
+        """
+        Write flat array of whole rows, beginning at row start.
+        """
+        self.set_elements(start * self.cols, values)
+
+    def get_tile(self, row, col, rows, cols):
+        """
+        List of lists of the elements in rows row to row+rows, and columns col
+        to col+cols.
+        """
+        tile = []
+        for i in range(row, min(row + rows, self.rows)):
+            offset = i * self.cols
+            tile.append(self.data[offset + col:offset + min(col + cols, self.cols)].tolist())
+        return tile
+
+    def set_tile(self, row, col, tile):
+        for i, values in enumerate(tile, start=row):
+            offset = i * self.cols + col
+            self.data[offset:offset + len(values)] = array(self.typecode, values)
+
+    def to_list(self):
+        return self.get_tile(0, 0, self.rows, self.cols)
+
+    def __getitem__(self, position):
+        i, j = position
+        return self.data[i * self.cols + j]
+
+    def flush(self):
+        self.mmap.flush()
+
+    def close(self):
+        # views must go before the map can close
+        self.data.release()
+        self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def result_typecode(A, B, operation='add'):
+    """
+    Typecode for the results of operation, 'add' or 'dot', on the elements of
+    A and B. Any float gives a double. Integers are one size wider than holds
+    the elements of both for add, to fit their sums, and 64 bit for dot.
+    Unsigned typecodes are upper case.
+    """
+    typecode = element_typecode(A.typecode, B.typecode)
+    if typecode == 'd':
+        return typecode
+    candidates = 'BHIQ' if typecode.isupper() else 'bhiq'
+    if operation == 'dot':
+        return candidates[-1]
+    itemsize = array(typecode).itemsize * 2
+    for candidate in candidates:
+        if array(candidate).itemsize >= itemsize:
+            return candidate
+    # nothing wider, sums may overflow
+    return typecode
+
+def element_typecode(*typecodes):
+    """
+    Typecode holding the elements of all typecodes. Any float gives a double,
+    otherwise the widest integer.
+    """
+    if any(typecode in 'fd' for typecode in typecodes):
+        return 'd'
+    itemsize = max(array(typecode).itemsize for typecode in typecodes)
+    if all(typecode.isupper() for typecode in typecodes):
+        candidates = 'BHILQ'
+    else:
+        candidates = 'bhilq'
+        # signed needs more room for the largest unsigned values
+        if any(typecode.isupper() and array(typecode).itemsize == itemsize
+               for typecode in typecodes):
+            itemsize *= 2
+    # prefer an operand's own typecode
+    for typecode in typecodes + tuple(candidates):
+        if typecode in candidates and array(typecode).itemsize >= itemsize:
+            return typecode
+    return candidates[-1]
+
+@contextlib.contextmanager
+def removed_on_error(C):
+    """
+    Close MappedMatrix C and remove its file if the block fails, instead of
+    leaving a partial result. Results too large for C's typecode are raised
+    as ValueError.
+    """
+    try:
+        yield C
+    except BaseException as error:
+        C.close()
+        os.remove(C.path)
+        if isinstance(error, OverflowError):
+            raise ValueError(f'results do not fit typecode {C.typecode!r}') from error
+        raise
+
+def tiled_add(A, B, path, max_elements=2**20):
+    """
+    Add MappedMatrix A and B, streaming blocks of elements in row-major order
+    into a new MappedMatrix at path. Blocks need not be whole rows, so rows
+    may be wider than max_elements.
+
+    :param max_elements: Optional bound, at least three, on the number of
+                         elements of the three matrices held in memory at
+                         once.
+    """
+    if (A.rows, A.cols) != (B.rows, B.cols):
+        raise ValueError('matrices must be the same size')
+    C = MappedMatrix.create(path, A.rows, A.cols, result_typecode(A, B))
+    block = max(1, max_elements // 3)
+    with removed_on_error(C):
+        for start in range(0, A.rows * A.cols, block):
+            stop = min(start + block, A.rows * A.cols)
+            values = map(operator.add, A.get_elements(start, stop), B.get_elements(start, stop))
+            C.set_elements(start, array(C.typecode, values))
+        C.flush()
+    return C
+
+def tiled_dotproduct(A, B, path, max_elements=2**20):
+    """
+    The dot product of MappedMatrix A and B, multiplying square tiles into a
+    new MappedMatrix at path.
+
+    :param max_elements: Optional bound, at least three, on the number of
+                         elements of the three matrices held in memory at
+                         once.
+    """
+    if A.cols != B.rows:
+        raise ValueError('columns of A must equal rows of B')
+    C = MappedMatrix.create(path, A.rows, B.cols, result_typecode(A, B, 'dot'))
+    # a tile of each A, B and C
+    size = max(1, math.isqrt(max_elements // 3))
+    with removed_on_error(C):
+        for i in range(0, A.rows, size):
+            for j in range(0, B.cols, size):
+                C_tile = None
+                for k in range(0, A.cols, size):
+                    product = dotproduct(A.get_tile(i, k, size, size), B.get_tile(k, j, size, size))
+                    C_tile = product if C_tile is None else add(C_tile, product)
+                if C_tile is not None:
+                    C.set_tile(i, j, C_tile)
+        C.flush()
+    return C
+
 # TODO:
 # determinant of matrix
 # https://www.mathsisfun.com/algebra/matrix-determinant.html
@@ -1,5 +1,11 @@
 # randomly found this
 # https://nsurendar.blogspot.com/2010/01/reverse-string-using-xor-and-without.html
+import mmap
+import os
+import tempfile
+import unittest
+
+from array import array
 
 def reversestring(s):
     s = list(map(ord, s))
@@ -17,4 +23,120 @@ def reversestring(s):
 
     return ''.join(map(chr, s))
 
+# array typecode of four byte unsigned integers, for UTF-32 code points
+codepoint_typecode = next(typecode for typecode in 'IL' if array(typecode).itemsize == 4)
+
+def reversestring_codepoints(s):
+    """
+    Reverse string s as an array of code points, done in C by the array.
+    Lone surrogates are kept, like reversestring does.
+    """
+    codepoints = array(codepoint_typecode)
+    codepoints.frombytes(s.encode('utf-32-le', errors='surrogatepass'))
+    codepoints.reverse()
+    return codepoints.tobytes().decode('utf-32-le', errors='surrogatepass')
+
+def reverse_buffer(buffer, chunk_size=2**16):
+    """
+    Reverse the items of a writable buffer in place, like bytearray,
+    memoryview, array.array or mmap. Buffers without a reverse method are
+    swapped a chunk from each end at a time, so memory use stays at two
+    chunks no matter the size of the buffer.
+
+    :param chunk_size: Optional number of items in a chunk.
+    """
+    if isinstance(buffer, (bytearray, array)):
+        buffer.reverse()
+        return
+    with memoryview(buffer) as view:
+        if view.readonly:
+            raise TypeError('buffer is read-only')
+        if view.ndim != 1:
+            raise TypeError('buffer must be one dimensional')
+        start = 0
+        end = len(view)
+        while end - start > 1:
+            n = min(chunk_size, (end - start) // 2)
+            head = array(view.format)
+            head.frombytes(view[start:start + n].cast('B'))
+            tail = array(view.format)
+            tail.frombytes(view[end - n:end].cast('B'))
+            head.reverse()
+            tail.reverse()
+            view[start:start + n] = tail
+            view[end - n:end] = head
+            start += n
+            end -= n
+
+def reverse_file(path, output=None, chunk_size=2**20):
+    """
+    Reverse the bytes of file at path. With no output, reverse it in place
+    through mmap. Otherwise write the reversed bytes to file path output,
+    reading fixed-size chunks from the end of the file.
+
+    :param chunk_size: Optional number of bytes to work on at a time.
+    """
+    if output is None:
+        if os.path.getsize(path) == 0:
+            # empty files cannot be mapped
+            return
+        with open(path, 'r+b') as file:
+            with mmap.mmap(file.fileno(), 0) as mapped:
+                reverse_buffer(mapped, chunk_size)
+                mapped.flush()
+        return
+    with open(path, 'rb') as input_file, open(output, 'wb') as output_file:
+        end = input_file.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - chunk_size)
+            input_file.seek(start)
+            chunk = bytearray(input_file.read(end - start))
+            chunk.reverse()
+            output_file.write(chunk)
+            end = start
+
 assert reversestring('abcdefg') == 'gfedcba'
+
+class TestReverseString(unittest.TestCase):
+
+    def test_codepoints(self):
+        self.assertEqual(reversestring_codepoints('abcdéfg😀'), '😀gfédcba')
+
+    def test_codepoints_surrogates(self):
+        s = 'a\ud800b'
+        self.assertEqual(reversestring_codepoints(s), reversestring(s))
+        self.assertEqual(reversestring_codepoints(s), 'b\ud800a')
+
+    def test_reverse_buffer(self):
+        buffer = bytearray(b'abcdefg')
+        reverse_buffer(memoryview(buffer), chunk_size=2)
+        self.assertEqual(buffer, b'gfedcba')
+        buffer = array('d', [1, 2, 3, 4])
+        reverse_buffer(memoryview(buffer), chunk_size=1)
+        self.assertEqual(buffer, array('d', [4, 3, 2, 1]))
+
+    def test_reverse_file(self):
+        """
+        Reverse in place and into another file, at sizes around the chunk
+        size.
+        """
+        chunk_size = 4
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data')
+            output = os.path.join(directory, 'reversed')
+            for size in (0, 1, 2, 3, 4, 5, 7, 8, 9, 16, 17):
+                data = bytes(range(size))
+                with self.subTest(size=size):
+                    with open(path, 'wb') as file:
+                        file.write(data)
+                    reverse_file(path, chunk_size=chunk_size)
+                    with open(path, 'rb') as file:
+                        self.assertEqual(file.read(), data[::-1])
+                    # back again, by chunks from the end
+                    reverse_file(path, output, chunk_size=chunk_size)
+                    with open(output, 'rb') as file:
+                        self.assertEqual(file.read(), data)
+
+
+if __name__ == '__main__':
+    unittest.main()